@@ -9,8 +9,11 @@ from flask import Flask, render_template, request, jsonify
 from charm_calculator import CharmCalculator
 from charm_spells_data import get_all_charm_spells, get_player_charm_spells
 from log_parser import CharmLogParser
+from rulesets import DEFAULT_RULESET, RULESETS, get_ruleset, load_rulesets
+from precomputed_results import DEFAULT_PATH as PRECOMPUTED_RESULTS_PATH, PrecomputedResults
 from werkzeug.utils import secure_filename
 import os
+import math
 import zipfile
 import io
 
@@ -18,7 +21,56 @@ app = Flask(__name__)
 # Vercel has a 4.5MB body size limit for serverless functions
 # ZIP compressed logs are typically 2-5% of original size
 app.config['MAX_CONTENT_LENGTH'] = 4 * 1024 * 1024  # 4 MB max file size (safe for Vercel)
-calculator = CharmCalculator()
+# Result cache for deterministic /api/calculate requests (size 0 disables, TTL 0 = no expiry)
+app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', 1024))
+app.config['RESULT_CACHE_TTL'] = float(os.environ.get('RESULT_CACHE_TTL', 0))
+# Processes used to split sampled (Monte Carlo) calculations
+app.config['SIMULATION_WORKERS'] = int(os.environ.get('SIMULATION_WORKERS', 1))
+# Build-time artifact served by /api/lookup (see precomputed_results.py; empty = disabled)
+app.config['PRECOMPUTED_RESULTS'] = os.environ.get(
+    'PRECOMPUTED_RESULTS', os.path.join(os.path.dirname(os.path.abspath(__file__)), PRECOMPUTED_RESULTS_PATH)
+)
+# Optional JSON file of custom server rulesets (see rulesets.py)
+app.config['RULESETS_FILE'] = os.environ.get('RULESETS_FILE')
+if app.config['RULESETS_FILE']:
+    load_rulesets(app.config['RULESETS_FILE'])
+calculators = {}  # ruleset name -> CharmCalculator
+
+
+def get_calculator(ruleset_name=None):
+    """
+    Calculator for a registered ruleset (default Quarm).
+
+    Raises:
+        ValueError: If the ruleset is unknown
+    """
+    ruleset = get_ruleset(ruleset_name)
+    if ruleset.name not in calculators or calculators[ruleset.name].ruleset is not ruleset:
+        calculators[ruleset.name] = CharmCalculator(ruleset)
+    return calculators[ruleset.name]
+
+
+def get_result_cache(calc):
+    """The result cache of a calculator's ruleset (each ruleset caches separately)."""
+    return calc.ruleset.result_cache(app.config['RESULT_CACHE_SIZE'], app.config['RESULT_CACHE_TTL'])
+
+
+def load_precomputed_results(path):
+    """
+    Open the /api/lookup artifact, or return None if it is missing or unreadable.
+
+    A corrupt or out-of-date file is logged and ignored so the other
+    endpoints keep working; /api/lookup then reports it as unavailable.
+    """
+    try:
+        return PrecomputedResults.load(path)
+    except Exception as e:
+        app.logger.error('Ignoring precomputed results %s: %s', path, e)
+        return None
+
+
+calculator = get_calculator()
+precomputed_results = load_precomputed_results(app.config['PRECOMPUTED_RESULTS'])
 
 
 @app.route('/')
@@ -32,6 +84,152 @@ def index():
     return response
 
 
+# Maximum number of scenarios accepted by /api/calculate_batch
+MAX_BATCH_SCENARIOS = 500
+
+# Maximum number of cells in a /api/sweep grid (e.g. every MR x every CHA)
+MAX_SWEEP_CELLS = 250000
+
+# Accepted range for each numeric scenario input: (label, min, max)
+PARAMETER_RANGES = CharmCalculator.PARAMETER_RANGES
+
+
+def check_parameter_range(parameter, value):
+    """Return a validation error message if value is outside the parameter's range."""
+    label, low, high = PARAMETER_RANGES[parameter]
+    if not (low <= value <= high):
+        return f'{label} must be between {low} and {high}'
+    return None
+
+
+def parse_calculate_params(data):
+    """
+    Parse and validate a calculate payload.
+
+    Returns:
+        Tuple of (params, error) - params is a dict of calculator arguments,
+        error is a message string when validation fails (params is then None)
+    """
+    try:
+        # Required parameters
+        caster_level = int(data.get('caster_level'))
+        target_level = int(data.get('target_level'))
+        target_mr = int(data.get('target_mr'))
+        resist_diff = int(data.get('resist_diff'))
+
+        # Optional parameters
+        pet_mr_items = int(data.get('pet_mr_items', 0))
+        caster_charisma = int(data.get('caster_charisma', 75))
+        is_enchanter = bool(data.get('is_enchanter', True))
+        num_ticks = int(data.get('num_ticks', 100))
+        num_simulations = int(data.get('num_simulations', 10000))
+        engine = str(data.get('engine', 'exact'))
+        tolerance_seconds = data.get('tolerance_seconds')
+        if tolerance_seconds is not None:
+            tolerance_seconds = float(tolerance_seconds)
+        tolerance_percentiles = tuple(int(p) for p in data.get('tolerance_percentiles', (50, 90)))
+        seed = data.get('seed')
+        if seed is not None:
+            seed = int(seed)
+        response_format = str(data.get('format', 'rows'))
+        ruleset = str(data.get('ruleset', DEFAULT_RULESET))
+    except (TypeError, ValueError) as e:
+        return None, f'Invalid input: {str(e)}'
+
+    # Validate inputs
+    for parameter, value in (('caster_level', caster_level), ('target_level', target_level),
+                             ('target_mr', target_mr), ('pet_mr_items', pet_mr_items),
+                             ('caster_charisma', caster_charisma)):
+        error = check_parameter_range(parameter, value)
+        if error:
+            return None, error
+    if not (1 <= num_ticks <= 1000):
+        return None, 'Number of ticks must be between 1 and 1000'
+    if not (100 <= num_simulations <= 100000):
+        return None, 'Number of simulations must be between 100 and 100000'
+    if engine not in CharmCalculator.ENGINES:
+        return None, f"Engine must be one of: {', '.join(CharmCalculator.ENGINES)}"
+    if tolerance_seconds is not None:
+        if engine == 'exact':
+            return None, 'Tolerance only applies to sampled engines (the exact engine has no sampling error)'
+        if not (tolerance_seconds > 0):
+            return None, 'Tolerance must be greater than 0 seconds'
+    if not set(tolerance_percentiles) <= {50, 90, 95, 99}:
+        return None, 'Tolerance percentiles must be from 50, 90, 95 and 99'
+    if seed is not None and not (0 <= seed < 2 ** 63):
+        return None, 'Seed must be between 0 and 2^63 - 1'
+    if engine == 'exact':
+        seed = None  # Nothing is sampled; keeps equivalent exact requests on one cache entry
+    if response_format not in CharmCalculator.RESPONSE_FORMATS:
+        return None, f"Format must be one of: {', '.join(CharmCalculator.RESPONSE_FORMATS)}"
+    if ruleset not in RULESETS:
+        return None, f"Ruleset must be one of: {', '.join(RULESETS)}"
+
+    return {
+        'caster_level': caster_level,
+        'target_level': target_level,
+        'target_mr': target_mr,
+        'pet_mr_items': pet_mr_items,
+        'resist_diff': resist_diff,
+        'caster_charisma': caster_charisma,
+        'is_enchanter': is_enchanter,
+        'num_ticks': num_ticks,
+        'num_simulations': num_simulations,
+        'engine': engine,
+        'tolerance_seconds': tolerance_seconds,
+        'tolerance_percentiles': tolerance_percentiles,
+        'seed': seed,
+        'format': response_format,
+        'ruleset': ruleset,
+    }, None
+
+
+def result_cache_key(params):
+    """
+    Result cache and key for validated calculate params, or (None, None) if not cacheable.
+
+    Exact and seeded sampled results are deterministic: a seeded run, including
+    a tolerance run (whose rounds have a fixed size), is identical for any
+    SIMULATION_WORKERS, so workers is not part of the key. Unseeded sampled
+    results are never cached.
+    Each ruleset has its own cache, which drops its results if the rules or
+    spell data changed.
+    """
+    if params['engine'] != 'exact' and params['seed'] is None:
+        return None, None
+    calc = get_calculator(params['ruleset'])
+    cache = get_result_cache(calc)
+    cache.validate(calc.cache_version)
+    return cache, tuple(sorted(params.items()))
+
+
+def calculate_result(params):
+    """Calculate land chance and break probability for validated params."""
+    calc = get_calculator(params['ruleset'])
+
+    # Calculate initial land chance (uses base MR, before pet items)
+    initial_land = calc.calculate_initial_land_chance(
+        params['caster_level'], params['target_level'], params['target_mr'],
+        params['resist_diff'], params['caster_charisma'], params['is_enchanter']
+    )
+
+    # Calculate charm break probabilities over time
+    # Uses effective MR after applying -MR debuffs and giving pet -MR items (lower MR = less likely to break)
+    effective_mr = params['target_mr'] - params['pet_mr_items']
+    break_prob = calc.calculate_charm_break_probability(
+        params['caster_level'], params['target_level'], effective_mr, params['resist_diff'],
+        params['caster_charisma'], params['is_enchanter'], params['num_ticks'],
+        params['num_simulations'], params['engine'], seed=params['seed'], workers=app.config['SIMULATION_WORKERS'],
+        tolerance_seconds=params['tolerance_seconds'], tolerance_percentiles=params['tolerance_percentiles'],
+        response_format=params['format']
+    )
+
+    return {
+        'initial_land_chance': initial_land,
+        'break_probability': break_prob
+    }
+
+
 @app.route('/api/calculate', methods=['POST'])
 def calculate():
     """
@@ -47,52 +245,422 @@ def calculate():
         "caster_charisma": int (optional, default 75),
         "is_enchanter": bool (optional, default true - only enchanters get CHA bonus!),
         "num_ticks": int (optional, default 100),
-        "num_simulations": int (optional, default 10000)
+        "num_simulations": int (optional, default 10000),
+        "engine": str (optional, default "exact" - or "monte_carlo"/"reference"/"numpy" for sampled results),
+        "tolerance_seconds": float (optional, sampled engines only - run until the 95% confidence
+                             intervals are within +/- this many seconds, num_simulations being the limit),
+        "tolerance_percentiles": [int] (optional, default [50, 90] - percentiles the tolerance applies to),
+        "seed": int (optional, sampled engines only - makes the result reproducible and cacheable),
+        "format": str (optional, default "rows" - "columnar" returns tick_series
+                  {start_tick, step_ticks, seconds_per_tick, prob_broke[]} instead of tick_probabilities),
+        "ruleset": str (optional, default "quarm" - see /api/rulesets)
     }
     """
     try:
         data = request.get_json()
 
-        # Required parameters
-        caster_level = int(data.get('caster_level'))
-        target_level = int(data.get('target_level'))
-        target_mr = int(data.get('target_mr'))
-        resist_diff = int(data.get('resist_diff'))
+        params, error = parse_calculate_params(data)
+        if error:
+            return jsonify({'error': error}), 400
 
-        # Optional parameters
-        pet_mr_items = int(data.get('pet_mr_items', 0))
-        caster_charisma = int(data.get('caster_charisma', 75))
-        is_enchanter = bool(data.get('is_enchanter', True))
-        num_ticks = int(data.get('num_ticks', 100))
-        num_simulations = int(data.get('num_simulations', 10000))
+        cache, cache_key = result_cache_key(params)
+        result = cache.get(cache_key) if cache_key is not None else None
+        cache_status = 'HIT' if result is not None else 'MISS'
 
-        # Validate inputs
-        if not (1 <= caster_level <= 60):
-            return jsonify({'error': 'Caster level must be between 1 and 60'}), 400
-        if not (1 <= target_level <= 65):
-            return jsonify({'error': 'Target level must be between 1 and 65'}), 400
-        if not (-200 <= target_mr <= 500):
-            return jsonify({'error': 'Target MR must be between -200 and 500'}), 400
-        if not (0 <= pet_mr_items <= 200):
-            return jsonify({'error': 'Pet MR items must be between 0 and 200'}), 400
-        if not (10 <= caster_charisma <= 300):
-            return jsonify({'error': 'Caster charisma must be between 10 and 300'}), 400
-        if not (1 <= num_ticks <= 1000):
-            return jsonify({'error': 'Number of ticks must be between 1 and 1000'}), 400
-        if not (100 <= num_simulations <= 100000):
-            return jsonify({'error': 'Number of simulations must be between 100 and 100000'}), 400
+        if result is None:
+            result = calculate_result(params)
+            if cache_key is not None:
+                cache.put(cache_key, result)
+
+        response = jsonify({
+            'success': True,
+            **result
+        })
+        response.headers['X-Cache'] = cache_status
+        return response
+
+    except ValueError as e:
+        return jsonify({'error': f'Invalid input: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+@app.route('/api/calculate_batch', methods=['POST'])
+def calculate_batch():
+    """
+    API endpoint to calculate many charm scenarios in one request.
+
+    Expected JSON payload:
+    {
+        "scenarios": [ {same fields as /api/calculate}, ... ]
+    }
+
+    Results are returned in input order. Scenarios that fail validation get
+    an {"error": ...} entry in their slot; the rest are still calculated.
+    """
+    try:
+        data = request.get_json()
+        scenarios = data.get('scenarios') if isinstance(data, dict) else None
+
+        if not isinstance(scenarios, list) or not scenarios:
+            return jsonify({'error': 'Expected a non-empty "scenarios" array'}), 400
+        if len(scenarios) > MAX_BATCH_SCENARIOS:
+            return jsonify({'error': f'At most {MAX_BATCH_SCENARIOS} scenarios per batch'}), 400
+
+        results = [None] * len(scenarios)
+        pending = []  # (index, params, cache, cache_key) still to calculate
+        for i, scenario in enumerate(scenarios):
+            params, error = parse_calculate_params(scenario) if isinstance(scenario, dict) else (
+                None, 'Invalid input: scenario must be an object'
+            )
+            if error:
+                results[i] = {'success': False, 'error': error}
+                continue
+
+            cache, cache_key = result_cache_key(params)
+            cached = cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                results[i] = {'success': True, **cached}
+            else:
+                pending.append((i, params, cache, cache_key))
+
+        # One vectorized batch per ruleset
+        for ruleset in dict.fromkeys(params['ruleset'] for _, params, _, _ in pending):
+            group = [entry for entry in pending if entry[1]['ruleset'] == ruleset]
+            batch_results = get_calculator(ruleset).calculate_batch([params for _, params, _, _ in group])
+            for (i, _, cache, cache_key), result in zip(group, batch_results):
+                if cache_key is not None:
+                    cache.put(cache_key, result)
+                results[i] = {'success': True, **result}
+
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+def parse_sweep_axis(axis):
+    """
+    Parse a sweep axis: {"parameter": str, "values": [int, ...]} or
+    {"parameter": str, "min": int, "max": int, "step": int (optional, default 1)}.
+
+    Returns:
+        Tuple of (parameter, values, error)
+    """
+    if not isinstance(axis, dict):
+        return None, None, 'Each axis must be an object'
+
+    parameter = axis.get('parameter')
+    if parameter not in CharmCalculator.SWEEP_PARAMETERS:
+        return None, None, f"Axis parameter must be one of: {', '.join(CharmCalculator.SWEEP_PARAMETERS)}"
+
+    try:
+        if 'values' in axis:
+            values = [int(value) for value in axis['values']]
+        else:
+            _, low, high = PARAMETER_RANGES[parameter]
+            step = int(axis.get('step', 1))
+            if step < 1:
+                return None, None, 'Axis step must be at least 1'
+            values = list(range(int(axis.get('min', low)), int(axis.get('max', high)) + 1, step))
+    except (TypeError, ValueError) as e:
+        return None, None, f'Invalid input: {str(e)}'
+
+    if not values:
+        return None, None, f'Axis {parameter} has no values'
+    for value in values:
+        error = check_parameter_range(parameter, value)
+        if error:
+            return None, None, error
+    return parameter, values, None
+
+
+@app.route('/api/sweep', methods=['POST'])
+def sweep():
+    """
+    API endpoint computing land chance and expected duration over a grid.
+
+    Expected JSON payload:
+    {
+        "x": axis, "y": axis (see parse_sweep_axis - e.g. {"parameter": "caster_level", "min": 1, "max": 60}),
+        ...fixed /api/calculate fields for every parameter not being swept
+    }
+
+    Results are columnar: flat row-major (x, then y) arrays of land_chance
+    and expected_duration_seconds (exact engine) with the grid shape.
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        x_parameter, x_values, error = parse_sweep_axis(data.get('x'))
+        if not error:
+            y_parameter, y_values, error = parse_sweep_axis(data.get('y'))
+        if error:
+            return jsonify({'error': error}), 400
+        if x_parameter == y_parameter:
+            return jsonify({'error': 'Axes must sweep different parameters'}), 400
+        if len(x_values) * len(y_values) > MAX_SWEEP_CELLS:
+            return jsonify({'error': f'Grid may have at most {MAX_SWEEP_CELLS} cells'}), 400
+
+        # Swept parameters only need a placeholder to pass validation
+        fixed = {**data, x_parameter: x_values[0], y_parameter: y_values[0]}
+        params, error = parse_calculate_params(fixed)
+        if error:
+            return jsonify({'error': error}), 400
+
+        grid = get_calculator(params['ruleset']).calculate_grid(
+            params, x_parameter, x_values, y_parameter, y_values
+        )
+
+        return jsonify({
+            'success': True,
+            **grid
+        })
+
+    except ValueError as e:
+        return jsonify({'error': f'Invalid input: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+# Maximum number of (level, MR) targets accepted by /api/target_mix
+MAX_MIX_TARGETS = 10000
+
+
+def parse_target_mix(data):
+    """
+    Parse the target distribution of a /api/target_mix payload.
+
+    Accepts either "targets": a list of [target_level, target_mr, weight]
+    (or objects with those keys), or "target_levels" and "target_mrs":
+    {value: weight} maps that are combined as independent distributions.
+
+    Returns:
+        Tuple of (targets, error) - targets is a list of (level, mr, weight)
+    """
+    try:
+        if data.get('targets') is not None:
+            targets = []
+            for target in data['targets']:
+                if isinstance(target, dict):
+                    target = (target.get('target_level'), target.get('target_mr'), target.get('weight', 1))
+                level, mr, weight = target
+                targets.append((int(level), int(mr), float(weight)))
+        elif data.get('target_levels') is not None and data.get('target_mrs') is not None:
+            levels = {int(level): float(weight) for level, weight in data['target_levels'].items()}
+            mrs = {int(mr): float(weight) for mr, weight in data['target_mrs'].items()}
+            targets = [(level, mr, level_weight * mr_weight)
+                       for level, level_weight in levels.items() for mr, mr_weight in mrs.items()]
+        else:
+            return None, 'Provide "targets" or both "target_levels" and "target_mrs"'
+    except (AttributeError, TypeError, ValueError) as e:
+        return None, f'Invalid targets: {str(e)}'
+
+    if not (1 <= len(targets) <= MAX_MIX_TARGETS):
+        return None, f'Provide between 1 and {MAX_MIX_TARGETS} targets'
+    for level, mr, weight in targets:
+        error = check_parameter_range('target_level', level) or check_parameter_range('target_mr', mr)
+        if error:
+            return None, error
+        if not (math.isfinite(weight) and weight >= 0):
+            return None, 'Target weights must be finite and not negative'
+    total = sum(weight for _, _, weight in targets)
+    if not total > 0:
+        return None, 'Target weights must not all be zero'
+    if not math.isfinite(total):
+        return None, 'Target weights are too large'
+
+    return targets, None
+
+
+@app.route('/api/target_mix', methods=['POST'])
+def target_mix():
+    """
+    API endpoint for the expected outcome over a distribution of targets.
+
+    Expected JSON payload:
+    {
+        "targets": [[target_level, target_mr, weight], ...]
+            or "target_levels": {level: weight}, "target_mrs": {mr: weight},
+        ...the other /api/calculate fields (exact engine)
+    }
+
+    Returns the weighted land chance, the mixture break curve (columnar
+    tick_series), expected duration and percentiles, and per-target results.
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
 
-        # Calculate initial land chance (uses base MR, before pet items)
-        initial_land = calculator.calculate_initial_land_chance(
-            caster_level, target_level, target_mr, resist_diff, caster_charisma, is_enchanter
+        targets, error = parse_target_mix(data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        # Targets come from the distribution; the first one fills the placeholders
+        params, error = parse_calculate_params({**data, 'target_level': targets[0][0], 'target_mr': targets[0][1]})
+        if error:
+            return jsonify({'error': error}), 400
+
+        return jsonify({
+            'success': True,
+            **get_calculator(params['ruleset']).calculate_target_mix(params, targets)
+        })
+
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid input: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+@app.route('/api/solve', methods=['POST'])
+def solve():
+    """
+    API endpoint finding the minimum CHA or -MR needed to meet a target.
+
+    Expected JSON payload:
+    {
+        "solve_for": "caster_charisma" or "pet_mr_items",
+        "metric": "land_chance", "expected_duration" or "percentile_duration",
+        "target": float (percent for land_chance, seconds for durations),
+        "percentile": int (optional, 50/90/95/99 for percentile_duration, default 50),
+        "min": int, "max": int (optional search range, defaults to the accepted input range),
+        ...fixed /api/calculate fields for the other inputs
+    }
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        parameter = data.get('solve_for')
+        if parameter not in CharmCalculator.SOLVE_PARAMETERS:
+            return jsonify({'error': f"solve_for must be one of: {', '.join(CharmCalculator.SOLVE_PARAMETERS)}"}), 400
+        metric = data.get('metric')
+        if metric not in CharmCalculator.SOLVE_METRICS:
+            return jsonify({'error': f"Metric must be one of: {', '.join(CharmCalculator.SOLVE_METRICS)}"}), 400
+
+        target = float(data.get('target'))
+        if not math.isfinite(target) or target < 0:
+            return jsonify({'error': 'Target must be a finite number of at least 0'}), 400
+        if metric == 'land_chance' and target > 100:
+            return jsonify({'error': 'Land chance target must be between 0 and 100'}), 400
+        percentile = int(data.get('percentile', 50))
+        if percentile not in (50, 90, 95, 99):
+            return jsonify({'error': 'Percentile must be 50, 90, 95 or 99'}), 400
+        _, low, high = PARAMETER_RANGES[parameter]
+        low = int(data.get('min', low))
+        high = int(data.get('max', high))
+        for value in (low, high):
+            error = check_parameter_range(parameter, value)
+            if error:
+                return jsonify({'error': error}), 400
+        if low > high:
+            return jsonify({'error': 'Search min must not exceed max'}), 400
+
+        # The solved parameter only needs a placeholder to pass validation
+        params, error = parse_calculate_params({**data, parameter: low})
+        if error:
+            return jsonify({'error': error}), 400
+
+        result = get_calculator(params['ruleset']).solve_minimum(
+            params, parameter, low, high, metric, target, percentile
         )
 
-        # Calculate charm break probabilities over time
-        # Uses effective MR after applying -MR debuffs and giving pet -MR items (lower MR = less likely to break)
-        effective_mr = target_mr - pet_mr_items
-        break_prob = calculator.calculate_charm_break_probability(
-            caster_level, target_level, effective_mr, resist_diff,
-            caster_charisma, is_enchanter, num_ticks, num_simulations
+        return jsonify({
+            'success': True,
+            'range': [low, high],
+            **result
+        })
+
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid input: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+@app.route('/api/sensitivity', methods=['POST'])
+def sensitivity():
+    """
+    API endpoint for the effect of +/-1 in CHA, MR, pet -MR, caster level and resist_diff.
+
+    Expected JSON payload: the same fields as /api/calculate. Returns the
+    base land chance and expected duration, the change for each step, and
+    the discontinuities near the scenario (CHA bonus steps, the level 51
+    cap, the Six Level Rule and resist floors).
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        params, error = parse_calculate_params(data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        return jsonify({
+            'success': True,
+            **get_calculator(params['ruleset']).calculate_sensitivity(params)
+        })
+
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid input: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+# Longest horizon and most curve points accepted by /api/long_horizon
+MAX_LONG_HORIZON_TICKS = 1000000
+MAX_CURVE_POINTS = 2000
+
+
+@app.route('/api/long_horizon', methods=['POST'])
+def long_horizon():
+    """
+    API endpoint for the exact break curve over a very long horizon.
+
+    Expected JSON payload:
+    {
+        "num_ticks": int (1 to 1,000,000, default 100000),
+        "num_points": int (optional, default 200 - most ticks reported on the curve),
+        "spacing": str (optional, "log" (default) or "uniform"),
+        ...the other /api/calculate scenario fields
+    }
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        # num_ticks has its own (much larger) limit here
+        params, error = parse_calculate_params({k: v for k, v in data.items() if k != 'num_ticks'})
+        if error:
+            return jsonify({'error': error}), 400
+
+        num_ticks = int(data.get('num_ticks', 100000))
+        num_points = int(data.get('num_points', 200))
+        spacing = str(data.get('spacing', 'log'))
+        if not (1 <= num_ticks <= MAX_LONG_HORIZON_TICKS):
+            return jsonify({'error': f'Number of ticks must be between 1 and {MAX_LONG_HORIZON_TICKS}'}), 400
+        if not (2 <= num_points <= MAX_CURVE_POINTS):
+            return jsonify({'error': f'Number of points must be between 2 and {MAX_CURVE_POINTS}'}), 400
+        if spacing not in CharmCalculator.CURVE_SPACINGS:
+            return jsonify({'error': f"Spacing must be one of: {', '.join(CharmCalculator.CURVE_SPACINGS)}"}), 400
+
+        calc = get_calculator(params['ruleset'])
+        initial_land = calc.calculate_initial_land_chance(
+            params['caster_level'], params['target_level'], params['target_mr'],
+            params['resist_diff'], params['caster_charisma'], params['is_enchanter']
+        )
+        break_prob = calc.calculate_long_horizon(
+            params['caster_level'], params['target_level'], params['target_mr'] - params['pet_mr_items'],
+            params['resist_diff'], params['caster_charisma'], params['is_enchanter'],
+            num_ticks=num_ticks, num_points=num_points, spacing=spacing
         )
 
         return jsonify({
@@ -101,12 +669,220 @@ def calculate():
             'break_probability': break_prob
         })
 
-    except ValueError as e:
+    except (TypeError, ValueError) as e:
         return jsonify({'error': f'Invalid input: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 
+# Longest encounter accepted by /api/session (24 hours)
+MAX_SESSION_SECONDS = 24 * 60 * 60
+
+
+@app.route('/api/session', methods=['POST'])
+def simulate_session():
+    """
+    API endpoint for expected pet uptime, recharms and mana over an encounter.
+
+    Expected JSON payload:
+    {
+        "spell_id": int (optional - supplies resist_diff, duration_ticks and mana),
+        "horizon_seconds": int (optional, default 3600),
+        "recast_delay_seconds": int (optional, default 0),
+        "duration_ticks": int (optional, overrides the spell's duration),
+        "mana_cost": int (optional, overrides the spell's mana),
+        ...the /api/calculate scenario fields (resist_diff required without spell_id)
+    }
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        spell = None
+        if data.get('spell_id') is not None:
+            spell = calculator.get_spell(int(data['spell_id']))
+            if spell is None:
+                return jsonify({'error': f"Unknown spell_id {data['spell_id']}"}), 400
+            data = {'resist_diff': spell['resist_diff'], **data}
+
+        params, error = parse_calculate_params(data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        horizon_seconds = int(data.get('horizon_seconds', 3600))
+        recast_delay_seconds = int(data.get('recast_delay_seconds', 0))
+        duration_ticks = data.get('duration_ticks', spell.get('duration_ticks') if spell else None)
+        duration_ticks = int(duration_ticks) if duration_ticks is not None else None
+        mana_cost = int(data.get('mana_cost', spell.get('mana', 0) if spell else 0))
+
+        if not (6 <= horizon_seconds <= MAX_SESSION_SECONDS):
+            return jsonify({'error': f'Horizon must be between 6 and {MAX_SESSION_SECONDS} seconds'}), 400
+        if not (0 <= recast_delay_seconds <= 600):
+            return jsonify({'error': 'Recast delay must be between 0 and 600 seconds'}), 400
+        if duration_ticks is not None and duration_ticks < 1:
+            return jsonify({'error': 'Duration must be at least 1 tick'}), 400
+        if mana_cost < 0:
+            return jsonify({'error': 'Mana cost must not be negative'}), 400
+
+        result = get_calculator(params['ruleset']).calculate_session(
+            params['caster_level'], params['target_level'], params['target_mr'], params['resist_diff'],
+            params['caster_charisma'], params['is_enchanter'], params['pet_mr_items'],
+            duration_ticks=duration_ticks,
+            mana_cost=mana_cost,
+            recast_delay_ticks=-(-recast_delay_seconds // 6),
+            horizon_ticks=-(-horizon_seconds // 6)
+        )
+
+        return jsonify({
+            'success': True,
+            **result
+        })
+
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid input: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+@app.route('/api/recommend', methods=['POST'])
+def recommend():
+    """
+    API endpoint ranking every eligible charm spell for a caster/target matchup.
+
+    Expected JSON payload:
+    {
+        "caster_class": str ("Enchanter", "Druid" or "Necromancer"),
+        "caster_level": int,
+        "target_level": int,
+        "target_mr": int,
+        "caster_charisma": int (optional, default 75),
+        "pet_mr_items": int (optional, default 0),
+        "is_animal": bool (optional, default false),
+        "is_undead": bool (optional, default false),
+        "num_ticks": int (optional, default 100),
+        "ruleset": str (optional, default "quarm")
+    }
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+
+        caster_classes = sorted({cls for spell in calculator.get_all_spells() for cls in spell['classes']})
+        caster_class = data.get('caster_class')
+        if caster_class not in caster_classes:
+            return jsonify({'error': f"Caster class must be one of: {', '.join(caster_classes)}"}), 400
+
+        values = {
+            'caster_level': int(data.get('caster_level')),
+            'target_level': int(data.get('target_level')),
+            'target_mr': int(data.get('target_mr')),
+            'caster_charisma': int(data.get('caster_charisma', 75)),
+            'pet_mr_items': int(data.get('pet_mr_items', 0)),
+        }
+        for parameter, value in values.items():
+            error = check_parameter_range(parameter, value)
+            if error:
+                return jsonify({'error': error}), 400
+        num_ticks = int(data.get('num_ticks', 100))
+        if not (1 <= num_ticks <= 1000):
+            return jsonify({'error': 'Number of ticks must be between 1 and 1000'}), 400
+
+        result = get_calculator(data.get('ruleset')).recommend_spells(
+            caster_class,
+            is_animal=bool(data.get('is_animal', False)),
+            is_undead=bool(data.get('is_undead', False)),
+            num_ticks=num_ticks,
+            **values
+        )
+
+        return jsonify({
+            'success': True,
+            **result
+        })
+
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid input: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+@app.route('/api/lookup', methods=['GET'])
+def lookup():
+    """
+    API endpoint for land chance and expected duration from the precomputed artifact.
+
+    Query parameters: caster_level, target_level, target_mr and either
+    spell_id or resist_diff, plus optional caster_charisma, is_enchanter
+    (true/false), pet_mr_items and num_ticks, as for /api/calculate.
+
+    Scenarios outside the precomputed slice (or without an artifact) are
+    calculated instead; 'source' says which was used.
+    """
+    try:
+        data = request.args.to_dict()
+        if 'spell_id' in data:
+            spell = calculator.get_spell(int(data['spell_id']))
+            if spell is None:
+                return jsonify({'error': f"Unknown spell_id {data['spell_id']}"}), 400
+            data.setdefault('resist_diff', spell['resist_diff'])
+        if 'is_enchanter' in data:
+            data['is_enchanter'] = data['is_enchanter'].lower() in ('1', 'true', 'yes')
+
+        params, error = parse_calculate_params(data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        calc = get_calculator(params['ruleset'])
+        scenario = (params['caster_level'], params['target_level'], params['target_mr'], params['resist_diff'],
+                    params['caster_charisma'], params['is_enchanter'])
+        result = None
+        # The artifact only answers for the ruleset it was built with
+        if precomputed_results is not None and precomputed_results.matches(calc):
+            result = precomputed_results.lookup(*scenario, params['pet_mr_items'], params['num_ticks'])
+        source = 'precomputed'
+        if result is None:
+            source = 'calculated'
+            result = calc.calculate_batch([params])[0]
+            result = {
+                'land_chance': result['initial_land_chance']['success_chance'],
+                'expected_duration_seconds': result['break_probability']['expected_duration_seconds'],
+            }
+
+        return jsonify({
+            'success': True,
+            'source': source,
+            'num_ticks': params['num_ticks'],
+            **result
+        })
+
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid input: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+@app.route('/api/cache_stats', methods=['GET'])
+def cache_stats():
+    """Report result cache size and hit/miss/eviction counters (default ruleset, and per ruleset)."""
+    return jsonify({
+        'success': True,
+        'cache': get_result_cache(calculator).stats(),
+        'rulesets': {name: get_result_cache(calc).stats() for name, calc in calculators.items()}
+    })
+
+
+@app.route('/api/rulesets', methods=['GET'])
+def rulesets():
+    """List the server rulesets accepted by the "ruleset" parameter."""
+    return jsonify({
+        'success': True,
+        'default': DEFAULT_RULESET,
+        'rulesets': [ruleset.to_dict() for ruleset in RULESETS.values()]
+    })
+
+
 @app.route('/api/spell_presets', methods=['GET'])
 def spell_presets():
     """Get available charm spell presets."""
@@ -162,7 +938,8 @@ def analyze_log():
         if not file.filename.lower().endswith('.zip'):
             return jsonify({'error': 'Only ZIP compressed files are accepted. Please compress your log file first.'}), 400
 
-        # Extract and read log content from ZIP
+        # Extract the log from the ZIP and parse it as it decompresses
+        parser = CharmLogParser()
         try:
             # Read ZIP file content
             zip_bytes = file.read()
@@ -185,18 +962,15 @@ def analyze_log():
                 if not log_file:
                     return jsonify({'error': 'No .txt or .log file found in ZIP archive'}), 400
 
-                # Extract and decode log content
-                log_content = zip_ref.read(log_file).decode('utf-8', errors='ignore')
+                # Stream and decode the log line by line instead of holding it all in memory
+                with zip_ref.open(log_file) as raw_log:
+                    stats = parser.parse_stream(io.TextIOWrapper(raw_log, encoding='utf-8', errors='ignore'))
 
         except zipfile.BadZipFile:
             return jsonify({'error': 'Invalid ZIP file format'}), 400
         except Exception as e:
             return jsonify({'error': f'Failed to extract ZIP file: {str(e)}'}), 400
 
-        # Parse log content
-        parser = CharmLogParser()
-        stats = parser.parse_log_content(log_content)
-
         if not stats['overall']:
             return jsonify({
                 'success': False,
@@ -5,9 +5,30 @@ This module implements the charm break calculation logic from EQMacEmu's
 zone/spells.cpp CheckResistSpell method, specifically for charm spells.
 """
 
+import hashlib
 import random
-from typing import Dict, Tuple
+import threading
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from itertools import accumulate, repeat, starmap
+from math import ceil, exp, expm1, log, log1p
+from operator import neg
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the 'numpy' engine is disabled without it
+    np = None
+
 from charm_spells_data import CHARM_SPELLS, get_charm_spell, get_charm_spell_by_name, get_all_charm_spells
+from resist_table import ResistTable
+from rulesets import Ruleset, get_ruleset
+
+# Fingerprint of the charm spell data, computed once: the data only changes
+# when charm_spells_data.py is regenerated, which means a restart
+SPELL_DATA_VERSION = hashlib.sha1(repr(sorted(CHARM_SPELLS.items())).encode()).hexdigest()[:12]
 
 
 class CharmCalculator:
@@ -21,6 +42,45 @@ class CharmCalculator:
     # Now loaded from charm_spells_data.py
     CHARM_SPELLS = CHARM_SPELLS
 
+    # Inputs that calculate_grid can sweep along an axis
+    SWEEP_PARAMETERS = ('caster_level', 'target_level', 'target_mr', 'pet_mr_items', 'caster_charisma')
+
+    # Inputs solve_minimum can search over, and the targets it can solve for
+    SOLVE_PARAMETERS = ('caster_charisma', 'pet_mr_items')
+    SOLVE_METRICS = ('land_chance', 'expected_duration', 'percentile_duration')
+
+    # Accepted range for each numeric scenario input: (label, min, max)
+    PARAMETER_RANGES = {
+        'caster_level': ('Caster level', 1, 60),
+        'target_level': ('Target level', 1, 65),
+        'target_mr': ('Target MR', -200, 500),
+        'pet_mr_items': ('Pet MR items', 0, 200),
+        'caster_charisma': ('Caster charisma', 10, 300),
+    }
+
+    # Inputs calculate_sensitivity steps by +/-1
+    SENSITIVITY_PARAMETERS = ('caster_charisma', 'target_mr', 'pet_mr_items', 'caster_level', 'resist_diff')
+
+    # Response layouts for the per-tick curve: a dict per tick, or parallel arrays
+    RESPONSE_FORMATS = ('rows', 'columnar')
+
+    # How calculate_long_horizon picks the ticks it reports
+    CURVE_SPACINGS = ('log', 'uniform')
+
+    # Simulations per seeded chunk; chunks are the unit of work for parallel runs
+    SIMULATION_CHUNK_SIZE = 10000
+
+    # Simulations per batch when running until a target precision, and batches
+    # per round between precision checks (fixed, so a seed stops at the same
+    # point for any worker count; workers only run a round's batches in parallel)
+    ADAPTIVE_CHUNK_SIZE = 1000
+    ADAPTIVE_ROUND_CHUNKS = 4
+
+    # Break probability engines: closed-form geometric model or sampling.
+    # 'monte_carlo' samples each charm's break tick directly in pure Python,
+    # 'reference' rolls every tick like the server does, 'numpy' is the vectorized sampler.
+    ENGINES = ('exact', 'monte_carlo', 'reference') + (('numpy',) if np is not None else ())
+
     @staticmethod
     def get_all_spells():
         """Get all charm spells."""
@@ -36,9 +96,46 @@ class CharmCalculator:
         """Get a specific charm spell by name."""
         return get_charm_spell_by_name(name)
 
-    def __init__(self):
-        self.use_classic_resists = True  # Quarm uses classic resists
-        self.charm_min_resist = 5  # From RuleI(Spells, CharmMinResist)
+    def __init__(self, ruleset: Optional[Ruleset] = None):
+        """
+        Args:
+            ruleset: Server resist rules (default: Quarm, see rulesets.py)
+        """
+        self.ruleset = ruleset or get_ruleset()
+
+        # Charm spells indexed for vectorized evaluation: the spell list (sorted
+        # by spell level) and, with NumPy, a resist_diff array aligned with it
+        spells = sorted(self.get_all_spells(), key=lambda spell: (spell.get('spell_level') or 0, spell['id']))
+        self._spell_index = {
+            'spells': spells,
+            'resist_diff': (np.array([spell['resist_diff'] for spell in spells], dtype=np.int64)
+                            if np is not None else None),
+        }
+
+    @property
+    def use_classic_resists(self) -> bool:
+        """Quarm uses classic resists (floors and a resist cap)."""
+        return self.ruleset.use_classic_resists
+
+    @property
+    def charm_min_resist(self) -> int:
+        """Minimum tick save resist chance, from RuleI(Spells, CharmMinResist)."""
+        return self.ruleset.charm_min_resist
+
+    @property
+    def cache_version(self) -> Tuple:
+        """Identifies the resist rules and spell data that results are computed with."""
+        return (self.ruleset.name, self.ruleset.rules, self.spell_data_version())
+
+    @staticmethod
+    def spell_data_version() -> str:
+        """Short fingerprint of the loaded charm spell data."""
+        return SPELL_DATA_VERSION
+
+    @property
+    def resist_table(self) -> ResistTable:
+        """Level modifier and floor table for this calculator's ruleset, compiled on first use."""
+        return self.ruleset.resist_table
 
     def calculate_resist_chance(self, caster_level: int, target_level: int,
                                 target_mr: int, resist_diff: int,
@@ -62,82 +159,30 @@ class CharmCalculator:
         """
 
         # Adjust caster level for tick saves (charm breaks)
-        effective_caster_level = caster_level + 4 if is_tick_save else caster_level
-
-        # Base resist value
-        target_resist = target_mr
-        resist_chance = 0
-
-        # Calculate level modifier
+        effective_caster_level = caster_level + self.ruleset.tick_save_level_bonus if is_tick_save else caster_level
         leveldiff = target_level - effective_caster_level
-        temp_level_diff = leveldiff
-
-        # NPC level difference caps for high level NPCs
-        # For NPCs level 51+, level difference is capped
-        if target_level >= 51:
-            a = 50 - effective_caster_level
-            if a > 0:
-                temp_level_diff = a
-            else:
-                temp_level_diff = 0
-
-        # Cap level difference at -9 for low targets
-        if temp_level_diff < -9:
-            temp_level_diff = -9
-
-        # Calculate base level modifier: (level_diff^2) / 2
-        level_mod = temp_level_diff * temp_level_diff // 2
-        if temp_level_diff < 0:
-            level_mod = -level_mod
-
-        # Additional resist bump for targets significantly above caster
-        if effective_caster_level < 50:
-            bump_level = effective_caster_level + 4 + effective_caster_level // 6
-            if target_level >= bump_level:
-                level_mod += 70 + effective_caster_level * 6
-        else:
-            if effective_caster_level < 64:
-                if leveldiff >= 13:
-                    level_mod = effective_caster_level * 5
-            else:
-                if leveldiff >= 16:
-                    level_mod = effective_caster_level * 5
 
-        # Apply the Six Level Rule (Quarm specific)
-        # If target is 7+ levels or 25%+ higher than caster, massive resist bonus
-        if target_level >= max(effective_caster_level + 7, int(effective_caster_level * 1.25)):
-            level_mod = 1000  # Effectively unresistable
+        # Level modifier and minimum resist come from the precomputed table
+        # inside the API's level range, and from the formula outside it
+        table = self.resist_table
+        if table.covers(caster_level, target_level):
+            level_mod, resist_floor = table.lookup(caster_level, target_level, is_tick_save)
+        else:
+            level_mod = self._level_modifier(effective_caster_level, target_level)
+            resist_floor = self._resist_floor(leveldiff, target_level, is_tick_save)
 
-        # Enchanter charisma bonus for charm spells (ENCHANTER ONLY!)
-        # From zone/spells.cpp: if (!tick_save && caster->GetClass() == Class::Enchanter)
-        resist_modifier = resist_diff
-        if is_enchanter and not is_tick_save and caster_charisma > 75:
-            resist_modifier -= (caster_charisma - 75) // 8
+        resist_modifier = self._resist_modifier(resist_diff, caster_charisma, is_enchanter, is_tick_save)
 
         # Build resist chance
-        resist_chance = target_resist + level_mod + resist_modifier
-
-        # Charm-specific minimum resist chance on tick saves
-        if is_tick_save:
-            if resist_chance < self.charm_min_resist:
-                resist_chance = self.charm_min_resist
-
-        # Classic resist minimum floors (applied to non-tick saves in classic)
-        if self.use_classic_resists and not is_tick_save:
-            # NPCs have minimum resist chances based on level difference
-            if leveldiff > -11 and target_level > 14:
-                if resist_chance < 10:  # SpellResistHighMinimumResistChance
-                    resist_chance = 10
-            elif leveldiff < -20 or target_level < 15:
-                if resist_chance < 2:  # SpellResistLowMinimumResistChance
-                    resist_chance = 2
-            else:
-                if resist_chance < 6:  # SpellResistBetweenMinimumResistChance
-                    resist_chance = 6
+        resist_chance = target_mr + level_mod + resist_modifier
+
+        # Minimum resist chance (charm tick save minimum or classic floors)
+        if resist_chance < resist_floor:
+            resist_chance = resist_floor
 
-        # Cap at 200 for classic
-        if self.use_classic_resists and resist_chance > 200:
-            resist_chance = 200
+        # Cap at the ruleset's resist cap (200) for classic
+        if self.use_classic_resists and resist_chance > self.ruleset.resist_cap:
+            resist_chance = self.ruleset.resist_cap
 
         return {
             'resist_chance': resist_chance,
@@ -147,20 +192,93 @@ class CharmCalculator:
             'success_chance': max(0, min(100, (200 - resist_chance) / 2))  # Convert 0-200 roll to percentage
         }
 
+    def calculate_resist_chances(self, caster_levels, target_levels, target_mrs, resist_diffs,
+                                 caster_charismas=75, is_enchanter=True, is_tick_save=False) -> Dict:
+        """
+        Vectorized calculate_resist_chance over NumPy arrays (or broadcastable scalars).
+
+        Uses the precomputed resist table, so levels must be within the API's
+        caster 1-60 / target 1-65 range. Requires NumPy.
+
+        Returns:
+            Dictionary of arrays with the same keys as calculate_resist_chance
+        """
+        if np is None:
+            raise RuntimeError("Vectorized resist calculations require NumPy")
+
+        caster_levels, target_levels, target_mrs, resist_diffs, caster_charismas, is_enchanter, is_tick_save = (
+            np.broadcast_arrays(
+                np.asarray(caster_levels, dtype=np.int64), np.asarray(target_levels, dtype=np.int64),
+                np.asarray(target_mrs, dtype=np.int64), np.asarray(resist_diffs, dtype=np.int64),
+                np.asarray(caster_charismas, dtype=np.int64), np.asarray(is_enchanter, dtype=bool),
+                np.asarray(is_tick_save, dtype=bool)
+            )
+        )
+
+        level_mod, resist_floor = self.resist_table.lookup_arrays(caster_levels, target_levels, is_tick_save)
+
+        cha_bonus = np.where(is_enchanter & ~is_tick_save & (caster_charismas > 75),
+                             (caster_charismas - 75) // 8, 0)
+        resist_modifier = resist_diffs - cha_bonus
+
+        resist_chance = np.maximum(target_mrs + level_mod + resist_modifier, resist_floor)
+        if self.use_classic_resists:
+            resist_chance = np.minimum(resist_chance, self.ruleset.resist_cap)
+
+        return {
+            'resist_chance': resist_chance,
+            'level_mod': level_mod,
+            'resist_modifier': resist_modifier,
+            'leveldiff': target_levels - np.where(is_tick_save, caster_levels + self.ruleset.tick_save_level_bonus,
+                                                  caster_levels),
+            'success_chance': np.clip((200 - resist_chance) / 2, 0, 100)
+        }
+
+    def _level_modifier(self, effective_caster_level: int, target_level: int) -> int:
+        """Level-difference resist modifier, including the Six Level Rule."""
+        return self.ruleset.level_modifier(effective_caster_level, target_level)
+
+    def _resist_floor(self, leveldiff: int, target_level: int, is_tick_save: bool) -> int:
+        """Minimum resist chance for a check (NO_FLOOR when none applies)."""
+        return self.ruleset.resist_floor(leveldiff, target_level, is_tick_save)
+
+    @staticmethod
+    def _resist_modifier(resist_diff: int, caster_charisma: int, is_enchanter: bool,
+                         is_tick_save: bool) -> int:
+        """Spell resist modifier after the enchanter charisma bonus."""
+        # Enchanter charisma bonus for charm spells (ENCHANTER ONLY!)
+        # From zone/spells.cpp: if (!tick_save && caster->GetClass() == Class::Enchanter)
+        resist_modifier = resist_diff
+        if is_enchanter and not is_tick_save and caster_charisma > 75:
+            resist_modifier -= (caster_charisma - 75) // 8
+        return resist_modifier
+
     def calculate_charm_break_probability(self, caster_level: int, target_level: int,
                                          target_mr: int, resist_diff: int,
                                          caster_charisma: int = 75,
                                          is_enchanter: bool = True,
                                          num_ticks: int = 100,
-                                         num_simulations: int = 10000) -> Dict:
+                                         num_simulations: int = 10000,
+                                         engine: str = 'exact',
+                                         seed: Optional[int] = None,
+                                         workers: int = 1,
+                                         tolerance_seconds: Optional[float] = None,
+                                         tolerance_percentiles: Tuple = (50, 90),
+                                         response_format: str = 'rows') -> Dict:
         """
-        Simulate charm break probability over time.
+        Calculate charm break probability over time.
 
         Charm breaks are checked each tick (6 seconds). The process is:
         1. 50% chance the check even happens
         2. If check happens, run CheckResistSpell with tick_save=True
         3. If resist check fails (returns != 100), charm breaks
 
+        Every tick is an independent trial with the same break chance, so the
+        tick the charm breaks on is geometrically distributed. The 'exact'
+        engine evaluates that distribution directly; the 'monte_carlo',
+        'reference' and 'numpy' engines sample it (one draw per charm in
+        Python, tick by tick in Python, or vectorized).
+
         Args:
             caster_level: Level of the caster
             target_level: Level of the target
@@ -169,11 +287,31 @@ class CharmCalculator:
             caster_charisma: Charisma of caster (only matters for enchanters on initial cast)
             is_enchanter: Whether the caster is an enchanter (CHA bonus only for enchanters)
             num_ticks: Number of ticks to simulate (1 tick = 6 seconds)
-            num_simulations: Number of Monte Carlo simulations to run
+            num_simulations: Number of Monte Carlo simulations to run (ignored by 'exact')
+            engine: 'exact' (default), 'monte_carlo', 'reference' or 'numpy' (requires NumPy)
+            seed: Seed for sampled engines; the same seed gives the same result
+                for any number of workers (returned as 'seed' in sampled responses)
+            workers: Processes to split sampled simulations across
+            tolerance_seconds: If set, sampled engines run in batches until the
+                95% confidence intervals on the expected duration and on
+                tolerance_percentiles are within +/- this many seconds;
+                num_simulations becomes the upper limit
+            tolerance_percentiles: Percentiles (of 50, 90, 95, 99) whose
+                confidence intervals must meet tolerance_seconds
+            response_format: 'rows' (default) for a tick_probabilities dict per
+                tick, or 'columnar' for a compact tick_series of parallel arrays
 
         Returns:
             Dictionary with break probabilities at various time points
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(self.ENGINES)}")
+        if response_format not in self.RESPONSE_FORMATS:
+            raise ValueError(
+                f"Unknown response format '{response_format}', expected one of {', '.join(self.RESPONSE_FORMATS)}"
+            )
+        if engine != 'exact' and num_simulations < 1:
+            raise ValueError("num_simulations must be at least 1")
 
         # Calculate the base resist chance for tick saves
         resist_info = self.calculate_resist_chance(
@@ -181,52 +319,234 @@ class CharmCalculator:
             caster_charisma, is_enchanter, is_tick_save=True
         )
 
-        # Single tick break probability
-        # 50% chance check happens, then roll 0-200 vs resist_chance
+        # Single tick break probability: the same chance every engine's curve is built from
         resist_chance = resist_info['resist_chance']
-        check_happens_prob = 0.50
-        resist_succeeds_prob = min(1.0, resist_chance / 200.0)
-        single_tick_break_prob = check_happens_prob * resist_succeeds_prob
+        single_tick_break_prob = self.tick_break_chance(resist_chance)
+
+        confidence_interval = None
+        if engine != 'exact' and seed is None and (workers > 1 or tolerance_seconds is not None):
+            seed = random.SystemRandom().getrandbits(63)
+
+        if engine == 'exact':
+            result = self._exact_break_distribution(resist_chance, num_ticks)
+        elif tolerance_seconds is not None:
+            result, num_simulations, confidence_interval = self._simulate_break_distribution_adaptive(
+                engine, resist_chance, num_ticks, num_simulations, seed, workers,
+                tolerance_seconds, tuple(tolerance_percentiles)
+            )
+        elif seed is not None:
+            result = self._simulate_break_distribution_chunked(
+                engine, resist_chance, num_ticks, num_simulations, seed, workers
+            )
+        elif engine == 'numpy':
+            result = self._simulate_break_distribution_numpy(resist_chance, num_ticks, num_simulations)
+        else:
+            result = self._simulate_break_distribution(resist_chance, num_ticks, num_simulations, engine)
+
+        response = self._format_break_result(
+            resist_info, single_tick_break_prob, num_ticks, num_simulations, engine,
+            response_format, **result
+        )
+        if confidence_interval is not None:
+            response['confidence_interval'] = confidence_interval
+        if engine != 'exact' and seed is not None:
+            # Replaying this seed reproduces the response exactly
+            response['seed'] = seed
+        return response
+
+    @staticmethod
+    def tick_break_chance(resist_chance: int) -> float:
+        """
+        Exact probability that a charm breaks on any single tick.
+
+        Mirrors the simulated tick: a 50% check, then an inclusive 0-200 roll
+        that breaks the charm when roll <= resist_chance (201 outcomes).
+        """
+        roll_breaks = max(0, min(resist_chance, 200) + 1) / 201.0
+        return 0.50 * roll_breaks
+
+    def _exact_break_distribution(self, resist_chance: int, num_ticks: int) -> Dict:
+        """
+        Evaluate the geometric break distribution in closed form.
+
+        The charm survives tick t with probability (1 - p) ** t. Break times
+        are capped at num_ticks, matching the simulation which records charms
+        that never broke as lasting the full duration.
+        """
+        p = self.tick_break_chance(resist_chance)
+        q = 1.0 - p
+
+        percentile_points = (50, 90, 95, 99)
+        percentiles = {}
+        prob_broke = []
+        survival = 1.0
+        expected_ticks = 0.0
+
+        for tick in range(1, num_ticks + 1):
+            # P(break time >= tick) summed over all ticks is the mean
+            expected_ticks += survival
+            survival *= q
+            broke = 1.0 - survival
+            prob_broke.append(broke)
+            for point in percentile_points:
+                if point not in percentiles and broke >= point / 100.0:
+                    percentiles[point] = tick
+
+        for point in percentile_points:
+            percentiles.setdefault(point, num_ticks)
+
+        return {
+            'prob_broke': prob_broke,
+            'avg_ticks': expected_ticks,
+            'min_ticks': 1 if p > 0 else num_ticks,
+            'max_ticks': num_ticks if q > 0 else 1,
+            'percentile_ticks': percentiles,
+            'still_active_fraction': survival,
+        }
+
+    @staticmethod
+    def _exact_survival_matrix(resist_chances, max_ticks: int) -> Tuple:
+        """
+        Survival curves for many tick-save resist chances at once.
+
+        Built with cumprod/cumsum along the tick axis, which performs the same
+        sequence of float operations as the scalar loop in
+        _exact_break_distribution, so each row matches it exactly.
+
+        Returns:
+            Tuple of (p, survival, expected_ticks): per-scenario tick break
+            chance, P(still held after tick t) and the mean break time in
+            ticks for a horizon of t ticks (column t - 1)
+        """
+        resist_chances = np.asarray(resist_chances, dtype=np.int64)
+        p = 0.50 * (np.maximum(0, np.minimum(resist_chances, 200) + 1) / 201.0)
+        q = 1.0 - p
+
+        survival = np.cumprod(np.repeat(q[..., None], max_ticks, axis=-1), axis=-1)
+        # Mean ticks is the running sum of P(break time >= tick), starting at 1.0
+        held_at_start = np.concatenate([np.ones_like(survival[..., :1]), survival[..., :-1]], axis=-1)
+        expected_ticks = np.cumsum(held_at_start, axis=-1)
+        return p, survival, expected_ticks
+
+    def _exact_break_distributions(self, resist_chances, num_ticks_list) -> List[Dict]:
+        """Vectorized _exact_break_distribution over many scenarios at once."""
+        num_ticks_list = [int(n) for n in num_ticks_list]
+        p, survival, expected_ticks = self._exact_survival_matrix(resist_chances, max(num_ticks_list))
+        broke = 1.0 - survival
+
+        results = []
+        for row, num_ticks in enumerate(num_ticks_list):
+            row_broke = broke[row, :num_ticks]
+            percentiles = {}
+            for point in (50, 90, 95, 99):
+                reached = row_broke >= point / 100.0
+                percentiles[point] = int(reached.argmax()) + 1 if reached.any() else num_ticks
 
-        # Run Monte Carlo simulation
+            results.append({
+                'prob_broke': row_broke.tolist(),
+                'avg_ticks': float(expected_ticks[row, num_ticks - 1]),
+                'min_ticks': 1 if p[row] > 0 else num_ticks,
+                'max_ticks': num_ticks if p[row] < 1 else 1,
+                'percentile_ticks': percentiles,
+                'still_active_fraction': float(survival[row, num_ticks - 1]),
+            })
+        return results
+
+    def _simulate_break_distribution(self, resist_chance: int, num_ticks: int,
+                                     num_simulations: int, engine: str = 'monte_carlo') -> Dict:
+        """Sample the break distribution with a pure-Python Monte Carlo simulation."""
+        sampler = self._monte_carlo_samples if engine == 'reference' else self._geometric_samples
+        breaks_by_tick, charms_still_active = sampler(resist_chance, num_ticks, num_simulations, random)
+        return self._summarize_breaks_by_tick(breaks_by_tick, charms_still_active, num_ticks)
+
+    @classmethod
+    def _geometric_samples(cls, resist_chance: int, num_ticks: int, num_simulations: int, rng) -> Tuple:
+        """
+        Sample each charm's break tick directly from the geometric distribution.
+
+        A charm survives t ticks with probability q ** t (q = 1 - break
+        chance), so a single uniform draw u in [0, 1) gives its break tick
+        through the inverse CDF: 1 + floor(log(1 - u) / log(q)). Same
+        distribution as _monte_carlo_samples, with one draw per charm
+        instead of up to two randint calls per tick. Draws are tallied in a
+        Counter keyed by ticks survived.
+
+        Args:
+            rng: The random module or a random.Random instance
+
+        Returns:
+            Tuple of (breaks_by_tick, charms_still_active); breaks_by_tick is an array('l')
+        """
+        breaks_by_tick = array('l', [0]) * (num_ticks + 1)
+        p = cls.tick_break_chance(resist_chance)
+        if p <= 0.0:
+            return breaks_by_tick, num_simulations
+
+        # floor(log(1 - u) / log(q)) for every draw, counted per value
+        scale = 1.0 / log(1.0 - p)
+        uniforms = starmap(rng.random, repeat((), num_simulations))
+        ticks_survived = Counter(map(int, map(scale.__mul__, map(log1p, map(neg, uniforms)))))
+
+        charms_still_active = num_simulations
+        for survived, count in ticks_survived.items():
+            if survived < num_ticks:
+                breaks_by_tick[survived + 1] += count
+                charms_still_active -= count
+
+        return breaks_by_tick, charms_still_active
+
+    @staticmethod
+    def _monte_carlo_samples(resist_chance: int, num_ticks: int, num_simulations: int, rng) -> Tuple:
+        """
+        Reference tick-by-tick simulation.
+
+        Args:
+            rng: The random module or a random.Random instance
+
+        Returns:
+            Tuple of (breaks_by_tick, charms_still_active)
+        """
         breaks_by_tick = [0] * (num_ticks + 1)
         charms_still_active = 0  # Count charms that lasted the full duration
-        break_times = []  # Track actual break times for percentile calculations
 
         for _ in range(num_simulations):
             broke = False
             for tick in range(1, num_ticks + 1):
                 # 50% chance check happens
-                if random.randint(0, 99) < 50:
+                if rng.randint(0, 99) < 50:
                     # Roll 0-200 vs resist_chance
-                    roll = random.randint(0, 200)
+                    roll = rng.randint(0, 200)
                     if roll <= resist_chance:
                         # Charm broke!
                         breaks_by_tick[tick] += 1
-                        break_times.append(tick * 6)  # Store break time in seconds
                         broke = True
                         break
 
             if not broke:
                 charms_still_active += 1
-                break_times.append(num_ticks * 6)  # Count as lasting full duration
+
+        return breaks_by_tick, charms_still_active
+
+    @classmethod
+    def _summarize_breaks_by_tick(cls, breaks_by_tick, charms_still_active: int, num_ticks: int) -> Dict:
+        """
+        Break curve and duration statistics from a break histogram.
+
+        Break times are quantized to ticks, so percentiles are read from
+        cumulative counts instead of a sorted list of every simulation:
+        O(num_ticks) memory and no sort.
+        """
+        # Break time counts: charms that never broke count as lasting the full duration
+        break_time_counts = list(breaks_by_tick[:num_ticks + 1])
+        break_time_counts[num_ticks] += charms_still_active
+        num_simulations = sum(break_time_counts)
 
         # Calculate cumulative probabilities
         cumulative_breaks = 0
-        tick_probabilities = []
-
+        prob_broke = []
         for tick in range(1, num_ticks + 1):
             cumulative_breaks += breaks_by_tick[tick]
-            prob_broke_by_tick = (cumulative_breaks / num_simulations) * 100
-            prob_still_held = 100 - prob_broke_by_tick
-
-            tick_probabilities.append({
-                'tick': tick,
-                'seconds': tick * 6,
-                'minutes': round(tick * 6 / 60, 1),
-                'prob_broke': round(prob_broke_by_tick, 2),
-                'prob_held': round(prob_still_held, 2)
-            })
+            prob_broke.append(cumulative_breaks / num_simulations)
 
         # Calculate expected duration (mean time to break)
         # For charms that never broke, use num_ticks as a conservative estimate
@@ -234,34 +554,265 @@ class CharmCalculator:
         total_ticks += charms_still_active * num_ticks
         avg_ticks = total_ticks / num_simulations if num_simulations > 0 else 0
 
-        # Calculate percentiles and min/max from break_times
-        sorted_break_times = sorted(break_times)
+        # Calculate percentiles and min/max from the break time histogram
+        cumulative = list(accumulate(break_time_counts))
+        observed = [tick for tick, count in enumerate(break_time_counts) if count]
+
+        return {
+            'prob_broke': prob_broke,
+            'avg_ticks': avg_ticks,
+            'min_ticks': observed[0] if observed else 0,
+            'max_ticks': observed[-1] if observed else 0,
+            'percentile_ticks': {
+                point: cls._histogram_percentile(cumulative, point) for point in (50, 90, 95, 99)
+            },
+            'still_active_fraction': charms_still_active / num_simulations if num_simulations > 0 else 0,
+        }
+
+    @staticmethod
+    def _histogram_percentile(cumulative: List[int], p: float) -> float:
+        """
+        Interpolated percentile of the values whose cumulative counts are given.
+
+        Same result as interpolating between neighbours of the sorted data
+        ((n - 1) * p / 100 rank, linear between floor and ceiling), where the
+        value at sorted position i is the first index whose cumulative count
+        exceeds i.
+        """
+        total = cumulative[-1] if cumulative else 0
+        if not total:
+            return 0
+        k = (total - 1) * (p / 100.0)
+        f = int(k)
+        c = f + 1
+        if c >= total:
+            return bisect_right(cumulative, total - 1)
+        low = bisect_right(cumulative, f)
+        high = bisect_right(cumulative, c)
+        return low + (k - f) * (high - low)
+
+    def _simulate_break_distribution_numpy(self, resist_chance: int, num_ticks: int,
+                                           num_simulations: int) -> Dict:
+        """
+        Vectorized Monte Carlo simulation using NumPy.
+
+        Rather than rolling every tick, draws the first-break tick of each
+        simulation from the geometric distribution in one call, then builds
+        the break histogram with bincount and the statistics with cumsum.
+        """
+        breaks_by_tick = self._numpy_break_histogram(
+            resist_chance, num_ticks, num_simulations, np.random.default_rng()
+        )
+        return self._summarize_break_histogram(breaks_by_tick, num_ticks)
+
+    @classmethod
+    def _numpy_break_histogram(cls, resist_chance: int, num_ticks: int, num_simulations: int, rng):
+        """
+        Histogram of first-break ticks drawn with a NumPy Generator.
+
+        Returns:
+            Array of length num_ticks + 2; index num_ticks + 1 collects charms that never broke
+        """
+        p = cls.tick_break_chance(resist_chance)
 
-        def percentile(data, p):
-            """Calculate percentile from sorted data."""
-            if not data:
-                return 0
-            k = (len(data) - 1) * (p / 100.0)
+        if p > 0:
+            first_break = rng.geometric(p, size=num_simulations)
+        else:
+            first_break = np.full(num_simulations, num_ticks + 1)
+
+        return np.bincount(np.minimum(first_break, num_ticks + 1), minlength=num_ticks + 2)
+
+    @staticmethod
+    def _summarize_break_histogram(breaks_by_tick, num_ticks: int) -> Dict:
+        """Break curve and duration statistics from a NumPy break histogram."""
+        num_simulations = int(breaks_by_tick.sum())
+        charms_still_active = int(breaks_by_tick[num_ticks + 1])
+
+        prob_broke = np.cumsum(breaks_by_tick[1:num_ticks + 1]) / num_simulations
+
+        # Break time histogram: charms that never broke count as lasting num_ticks
+        break_time_counts = breaks_by_tick[:num_ticks + 1].copy()
+        break_time_counts[num_ticks] += charms_still_active
+        cumulative = np.cumsum(break_time_counts)
+        observed = np.flatnonzero(break_time_counts)
+
+        def percentile(p):
+            """Interpolated percentile over the sorted break times, read from the histogram."""
+            k = (num_simulations - 1) * (p / 100.0)
             f = int(k)
-            c = f + 1
-            if c >= len(data):
-                return data[-1]
-            return data[f] + (k - f) * (data[c] - data[f])
+            low = int(np.searchsorted(cumulative, f, side='right'))
+            if f + 1 >= num_simulations:
+                return low
+            high = int(np.searchsorted(cumulative, f + 1, side='right'))
+            return low + (k - f) * (high - low)
+
+        return {
+            'prob_broke': prob_broke.tolist(),
+            'avg_ticks': float(np.dot(np.arange(num_ticks + 1), break_time_counts)) / num_simulations,
+            'min_ticks': int(observed[0]) if observed.size else 0,
+            'max_ticks': int(observed[-1]) if observed.size else 0,
+            'percentile_ticks': {point: percentile(point) for point in (50, 90, 95, 99)},
+            'still_active_fraction': charms_still_active / num_simulations,
+        }
+
+    def _simulate_break_distribution_chunked(self, engine: str, resist_chance: int, num_ticks: int,
+                                             num_simulations: int, seed: int, workers: int) -> Dict:
+        """
+        Seeded simulation split into fixed-size chunks, optionally across processes.
+
+        Chunk i always draws from its own stream derived from (seed, i), and
+        the merged histogram is the sum over chunks, so the result for a
+        given seed is identical however many workers run the chunks.
+        """
+        chunk_sizes = [self.SIMULATION_CHUNK_SIZE] * (num_simulations // self.SIMULATION_CHUNK_SIZE)
+        if num_simulations % self.SIMULATION_CHUNK_SIZE:
+            chunk_sizes.append(num_simulations % self.SIMULATION_CHUNK_SIZE)
+        tasks = [(engine, resist_chance, num_ticks, size, seed, index)
+                 for index, size in enumerate(chunk_sizes)]
+
+        breaks_by_tick = self._run_chunks(tasks, workers)
+        return self._summarize_merged_histogram(engine, breaks_by_tick, num_ticks)
+
+    def _simulate_break_distribution_adaptive(self, engine: str, resist_chance: int, num_ticks: int,
+                                              max_simulations: int, seed: int, workers: int,
+                                              tolerance_seconds: float,
+                                              tolerance_percentiles: Tuple) -> Tuple[Dict, int, Dict]:
+        """
+        Seeded simulation that runs in batches until the results are precise enough.
+
+        Stops once the 95% confidence intervals on the expected duration and on
+        each of tolerance_percentiles are no wider than +/- tolerance_seconds,
+        or when max_simulations have been run.
+
+        Returns:
+            Tuple of (distribution, simulations run, confidence_interval details)
+        """
+        if max_simulations < 1:
+            raise ValueError("max_simulations must be at least 1")
+        chunk_size = self.ADAPTIVE_CHUNK_SIZE
+        chunks_per_round = self.ADAPTIVE_ROUND_CHUNKS
+        breaks_by_tick = [0] * (num_ticks + 2)
+        completed = 0
+        chunk_index = 0
+        converged = False
+
+        while completed < max_simulations:
+            tasks = []
+            while len(tasks) < chunks_per_round and completed < max_simulations:
+                size = min(chunk_size, max_simulations - completed)
+                tasks.append((engine, resist_chance, num_ticks, size, seed, chunk_index))
+                chunk_index += 1
+                completed += size
+
+            for tick, count in enumerate(self._run_chunks(tasks, workers)):
+                breaks_by_tick[tick] += count
+
+            intervals = self._confidence_intervals(breaks_by_tick, num_ticks, tolerance_percentiles)
+            if all((high - low) * 6 / 2 <= tolerance_seconds for low, high in intervals.values()):
+                converged = True
+                break
+
+        confidence_interval = {
+            'level': 0.95,
+            'tolerance_seconds': tolerance_seconds,
+            'converged': converged,
+        }
+        for name, (low, high) in intervals.items():
+            label = 'avg' if name == 'avg' else ('median' if name == 50 else f'p{name}')
+            confidence_interval[f'{label}_seconds'] = [round(low * 6, 1), round(high * 6, 1)]
+
+        distribution = self._summarize_merged_histogram(engine, breaks_by_tick, num_ticks)
+        return distribution, completed, confidence_interval
+
+    @staticmethod
+    def _run_chunks(tasks: List[Tuple], workers: int) -> List[int]:
+        """Simulate chunks (in a process pool when workers > 1) and sum their histograms."""
+        if workers > 1 and len(tasks) > 1:
+            histograms = list(_get_process_pool(workers).map(_simulate_chunk, tasks))
+        else:
+            histograms = [_simulate_chunk(task) for task in tasks]
+        return [sum(counts) for counts in zip(*histograms)]
+
+    def _summarize_merged_histogram(self, engine: str, breaks_by_tick: List[int], num_ticks: int) -> Dict:
+        """Statistics for a histogram merged from seeded chunks."""
+        if engine == 'numpy':
+            return self._summarize_break_histogram(np.array(breaks_by_tick), num_ticks)
+        return self._summarize_breaks_by_tick(breaks_by_tick, breaks_by_tick[num_ticks + 1], num_ticks)
+
+    @staticmethod
+    def _confidence_intervals(breaks_by_tick: List[int], num_ticks: int, percentiles) -> Dict:
+        """
+        95% confidence intervals (in ticks) for the mean and percentiles of the break time.
+
+        The mean uses the normal approximation; percentiles use the
+        distribution-free order statistic interval, read off the histogram.
+        """
+        z = 1.96
+        # Break time counts with charms that never broke lasting num_ticks
+        counts = breaks_by_tick[:num_ticks + 1]
+        counts[num_ticks] += breaks_by_tick[num_ticks + 1]
+        n = sum(counts)
+
+        total = sum(tick * count for tick, count in enumerate(counts))
+        total_squares = sum(tick * tick * count for tick, count in enumerate(counts))
+        mean = total / n
+        variance = max(0.0, (total_squares - n * mean * mean) / (n - 1)) if n > 1 else 0.0
+        half_width = z * (variance / n) ** 0.5
+        intervals = {'avg': (mean - half_width, mean + half_width)}
+
+        cumulative = list(accumulate(counts))
+        for point in percentiles:
+            fraction = point / 100.0
+            spread = z * (n * fraction * (1 - fraction)) ** 0.5
+            low_rank = max(0, int(n * fraction - spread))
+            high_rank = min(n - 1, int(n * fraction + spread) + 1)
+            intervals[point] = (bisect_right(cumulative, low_rank), bisect_right(cumulative, high_rank))
+        return intervals
+
+    @staticmethod
+    def _format_break_result(resist_info: Dict, single_tick_break_prob: float,
+                             num_ticks: int, num_simulations: int, engine: str,
+                             response_format: str, prob_broke, avg_ticks: float,
+                             min_ticks: float, max_ticks: float, percentile_ticks: Dict,
+                             still_active_fraction: float) -> Dict:
+        """Build the break probability response shared by every engine."""
+        if response_format == 'columnar':
+            # Tick, time and prob_held (100 - prob_broke) are implied by the series
+            curve = ('tick_series', {
+                'start_tick': 1,
+                'step_ticks': 1,
+                'seconds_per_tick': 6,
+                'prob_broke': [round(broke * 100, 2) for broke in prob_broke],
+            })
+        else:
+            tick_probabilities = []
+            for tick, broke in enumerate(prob_broke, start=1):
+                prob_broke_by_tick = broke * 100
+                prob_still_held = 100 - prob_broke_by_tick
+
+                tick_probabilities.append({
+                    'tick': tick,
+                    'seconds': tick * 6,
+                    'minutes': round(tick * 6 / 60, 1),
+                    'prob_broke': round(prob_broke_by_tick, 2),
+                    'prob_held': round(prob_still_held, 2)
+                })
+            curve = ('tick_probabilities', tick_probabilities)
 
         duration_stats = {
-            'min': min(break_times) if break_times else 0,
-            'max': max(break_times) if break_times else 0,
+            'min': min_ticks * 6,
+            'max': max_ticks * 6,
             'avg': avg_ticks * 6,
-            'median': percentile(sorted_break_times, 50),
-            'p90': percentile(sorted_break_times, 90),
-            'p95': percentile(sorted_break_times, 95),
-            'p99': percentile(sorted_break_times, 99),
+            'median': percentile_ticks[50] * 6,
+            'p90': percentile_ticks[90] * 6,
+            'p95': percentile_ticks[95] * 6,
+            'p99': percentile_ticks[99] * 6,
         }
 
         return {
             'single_tick_break_probability': round(single_tick_break_prob * 100, 2),
             'resist_info': resist_info,
-            'tick_probabilities': tick_probabilities,
+            curve[0]: curve[1],
             'expected_duration_seconds': round(avg_ticks * 6, 1),
             'expected_duration_minutes': round(avg_ticks * 6 / 60, 2),
             'duration_stats': {
@@ -280,9 +831,11 @@ class CharmCalculator:
                 'p99_seconds': round(duration_stats['p99'], 1),
                 'p99_minutes': round(duration_stats['p99'] / 60, 2),
             },
-            'charms_still_active': charms_still_active,
-            'percent_lasting_full_duration': round((charms_still_active / num_simulations) * 100, 2),
-            'num_simulations': num_simulations
+            # For the exact engine this is the expected count out of num_simulations
+            'charms_still_active': round(still_active_fraction * num_simulations),
+            'percent_lasting_full_duration': round(still_active_fraction * 100, 2),
+            'num_simulations': num_simulations,
+            'engine': engine
         }
 
     def calculate_initial_land_chance(self, caster_level: int, target_level: int,
@@ -310,3 +863,809 @@ class CharmCalculator:
 
         return resist_info
 
+    def calculate_batch(self, scenarios: List[Dict]) -> List[Dict]:
+        """
+        Calculate land chance and break probability for many scenarios in one pass.
+
+        Each scenario holds the keyword arguments of calculate_initial_land_chance
+        and calculate_charm_break_probability, plus 'pet_mr_items' (subtracted
+        from target_mr for tick saves only, as in the web API) and 'format',
+        which is passed on as response_format.
+
+        With NumPy, resist chances and exact break curves for all scenarios
+        are computed as array operations; otherwise each scenario is
+        calculated in turn.
+
+        Args:
+            scenarios: List of scenario dictionaries
+
+        Returns:
+            List of {'initial_land_chance', 'break_probability'} dictionaries,
+            in the same order as the input
+        """
+        if not scenarios:
+            return []
+
+        scenarios = [{
+            'pet_mr_items': 0, 'caster_charisma': 75, 'is_enchanter': True,
+            'num_ticks': 100, 'num_simulations': 10000, 'engine': 'exact', 'format': 'rows', **scenario
+        } for scenario in scenarios]
+
+        if np is None:
+            return [self._calculate_scenario(scenario) for scenario in scenarios]
+
+        def column(key):
+            return np.array([scenario[key] for scenario in scenarios])
+
+        caster_levels = column('caster_level')
+        target_levels = column('target_level')
+        target_mrs = column('target_mr')
+        resist_diffs = column('resist_diff')
+        caster_charismas = column('caster_charisma')
+        is_enchanter = column('is_enchanter').astype(bool)
+
+        initial = self.calculate_resist_chances(
+            caster_levels, target_levels, target_mrs, resist_diffs,
+            caster_charismas, is_enchanter, is_tick_save=False
+        )
+        tick_save = self.calculate_resist_chances(
+            caster_levels, target_levels, target_mrs - column('pet_mr_items'), resist_diffs,
+            caster_charismas, is_enchanter, is_tick_save=True
+        )
+
+        exact_rows = [i for i, scenario in enumerate(scenarios) if scenario['engine'] == 'exact']
+        exact_results = {}
+        if exact_rows:
+            distributions = self._exact_break_distributions(
+                tick_save['resist_chance'][exact_rows],
+                [scenarios[i]['num_ticks'] for i in exact_rows]
+            )
+            exact_results = dict(zip(exact_rows, distributions))
+
+        results = []
+        for i, scenario in enumerate(scenarios):
+            if i not in exact_results:
+                results.append(self._calculate_scenario(scenario))
+                continue
+
+            resist_info = self._resist_info_at(tick_save, i)
+            resist_chance = resist_info['resist_chance']
+            single_tick_break_prob = self.tick_break_chance(resist_chance)
+            results.append({
+                'initial_land_chance': self._resist_info_at(initial, i),
+                'break_probability': self._format_break_result(
+                    resist_info, single_tick_break_prob, scenario['num_ticks'],
+                    scenario['num_simulations'], 'exact', scenario['format'], **exact_results[i]
+                )
+            })
+        return results
+
+    def calculate_grid(self, scenario: Dict, x_parameter: str, x_values,
+                       y_parameter: str, y_values) -> Dict:
+        """
+        Land chance and exact expected duration over a two-parameter grid.
+
+        Every cell is computed in one vectorized pass (requires NumPy). The
+        expected duration only depends on the tick-save resist chance, so
+        survival curves are built once per distinct resist chance.
+
+        Args:
+            scenario: Fixed calculate arguments (as for calculate_batch); the
+                swept parameters are taken from the axes instead
+            x_parameter: Parameter varied along the first axis (see SWEEP_PARAMETERS)
+            x_values: Values for the first axis
+            y_parameter: Parameter varied along the second axis
+            y_values: Values for the second axis
+
+        Returns:
+            Dictionary with both axes and row-major (x, then y) flat lists of
+            land_chance and expected_duration_seconds
+        """
+        if np is None:
+            raise RuntimeError("Grid calculations require NumPy")
+        for parameter in (x_parameter, y_parameter):
+            if parameter not in self.SWEEP_PARAMETERS:
+                raise ValueError(f"Cannot sweep '{parameter}', expected one of {', '.join(self.SWEEP_PARAMETERS)}")
+        if x_parameter == y_parameter:
+            raise ValueError("Grid axes must sweep different parameters")
+
+        x_values = [int(value) for value in x_values]
+        y_values = [int(value) for value in y_values]
+        x_grid, y_grid = np.meshgrid(np.array(x_values, dtype=np.int64),
+                                     np.array(y_values, dtype=np.int64), indexing='ij')
+
+        params = {'pet_mr_items': 0, 'caster_charisma': 75, 'is_enchanter': True, 'num_ticks': 100, **scenario}
+        params[x_parameter] = x_grid
+        params[y_parameter] = y_grid
+
+        initial = self.calculate_resist_chances(
+            params['caster_level'], params['target_level'], params['target_mr'], params['resist_diff'],
+            params['caster_charisma'], params['is_enchanter'], is_tick_save=False
+        )
+        tick_save = self.calculate_resist_chances(
+            params['caster_level'], params['target_level'],
+            np.asarray(params['target_mr']) - params['pet_mr_items'], params['resist_diff'],
+            params['caster_charisma'], params['is_enchanter'], is_tick_save=True
+        )
+
+        num_ticks = int(params['num_ticks'])
+        unique_chances, inverse = np.unique(tick_save['resist_chance'], return_inverse=True)
+        _, _, expected_ticks = self._exact_survival_matrix(unique_chances, num_ticks)
+        unique_seconds = [round(float(ticks) * 6, 1) for ticks in expected_ticks[:, num_ticks - 1]]
+        expected_seconds = np.array(unique_seconds)[inverse.reshape(-1)]
+
+        return {
+            'x': {'parameter': x_parameter, 'values': x_values},
+            'y': {'parameter': y_parameter, 'values': y_values},
+            'shape': [len(x_values), len(y_values)],
+            'num_ticks': num_ticks,
+            'land_chance': initial['success_chance'].reshape(-1).tolist(),
+            'expected_duration_seconds': expected_seconds.tolist(),
+        }
+
+    def calculate_target_mix(self, scenario: Dict, targets) -> Dict:
+        """
+        Break curve and expected duration over a mix of targets (e.g. a zone's NPCs).
+
+        Each target is a (target_level, target_mr, weight) triple; weights are
+        relative frequencies and need not sum to 1. The mixture curve is the
+        weighted sum of the per-target exact survival curves, built in one
+        vectorized pass (requires NumPy): targets sharing a tick-save resist
+        chance share a curve, so the work grows with the distinct resist
+        chances rather than the number of targets.
+
+        Args:
+            scenario: Fixed calculate arguments (as for calculate_batch) except
+                target_level and target_mr, which come from targets
+            targets: Iterable of (target_level, target_mr, weight)
+
+        Returns:
+            Dictionary with the weighted land chance, the mixture tick_series,
+            expected duration and percentiles, and each target's own results
+        """
+        if np is None:
+            raise RuntimeError("Target mix calculations require NumPy")
+
+        targets = [(int(level), int(mr), float(weight)) for level, mr, weight in targets]
+        if not targets:
+            raise ValueError("At least one target is required")
+        levels, mrs, weights = (np.array(column) for column in zip(*targets))
+        if (weights < 0).any() or not (weights.sum() > 0 and np.isfinite(weights.sum())):
+            raise ValueError("Target weights must be finite, non-negative and not all zero")
+        weights = weights / weights.sum()
+
+        params = {'pet_mr_items': 0, 'caster_charisma': 75, 'is_enchanter': True, 'num_ticks': 100, **scenario}
+        num_ticks = int(params['num_ticks'])
+
+        initial = self.calculate_resist_chances(
+            params['caster_level'], levels, mrs, params['resist_diff'],
+            params['caster_charisma'], params['is_enchanter'], is_tick_save=False
+        )
+        tick_save = self.calculate_resist_chances(
+            params['caster_level'], levels, mrs - params['pet_mr_items'], params['resist_diff'],
+            params['caster_charisma'], params['is_enchanter'], is_tick_save=True
+        )
+
+        unique_chances, inverse = np.unique(tick_save['resist_chance'], return_inverse=True)
+        _, survival, expected_ticks = self._exact_survival_matrix(unique_chances, num_ticks)
+        curve_weights = np.bincount(inverse.reshape(-1), weights=weights, minlength=len(unique_chances))
+
+        mixture_held = curve_weights @ survival
+        mixture_broke = 1.0 - mixture_held
+        mixture_ticks = float(curve_weights @ expected_ticks[:, num_ticks - 1])
+
+        duration_stats = {}
+        for name, point in (('median', 50), ('p90', 90), ('p95', 95), ('p99', 99)):
+            reached = mixture_broke >= point / 100.0
+            tick = int(reached.argmax()) + 1 if reached.any() else num_ticks
+            duration_stats[f'{name}_seconds'] = tick * 6
+            duration_stats[f'{name}_minutes'] = round(tick * 6 / 60, 2)
+
+        target_seconds = expected_ticks[inverse.reshape(-1), num_ticks - 1] * 6
+        return {
+            'num_targets': len(targets),
+            'num_ticks': num_ticks,
+            'land_chance': round(float(weights @ initial['success_chance']), 2),
+            'tick_series': {
+                'start_tick': 1,
+                'step_ticks': 1,
+                'seconds_per_tick': 6,
+                'prob_broke': [round(broke * 100, 2) for broke in mixture_broke.tolist()],
+            },
+            'expected_duration_seconds': round(mixture_ticks * 6, 1),
+            'expected_duration_minutes': round(mixture_ticks * 6 / 60, 2),
+            'duration_stats': duration_stats,
+            'percent_lasting_full_duration': round(float(mixture_held[-1]) * 100, 2),
+            'targets': [
+                {
+                    'target_level': level,
+                    'target_mr': mr,
+                    'weight': round(float(weight), 6),
+                    'land_chance': float(land),
+                    'expected_duration_seconds': round(float(seconds), 1),
+                }
+                for (level, mr, _), weight, land, seconds
+                in zip(targets, weights, initial['success_chance'].tolist(), target_seconds)
+            ],
+        }
+
+    def recommend_spells(self, caster_class: str, caster_level: int, target_level: int,
+                         target_mr: int, caster_charisma: int = 75, pet_mr_items: int = 0,
+                         is_animal: bool = False, is_undead: bool = False,
+                         num_ticks: int = 100) -> Dict:
+        """
+        Rank every charm spell the caster could use on a target.
+
+        A spell is eligible if the caster's class has it, the caster is at
+        least its spell level, the target is at or below its max level and
+        the target type satisfies animal_only / undead_only. Eligible spells
+        are evaluated together over the pre-indexed spell table and ranked by
+        land chance, then exact expected duration.
+
+        Args:
+            caster_class: 'Enchanter', 'Druid' or 'Necromancer' (only enchanters get the CHA bonus)
+            caster_level: Level of the caster
+            target_level: Level of the target
+            target_mr: Magic resist of the target
+            caster_charisma: Charisma of the caster
+            pet_mr_items: -MR from debuffs and pet items (tick saves only)
+            is_animal: Whether the target is an animal
+            is_undead: Whether the target is undead
+            num_ticks: Horizon for the expected duration (1 tick = 6 seconds)
+
+        Returns:
+            Dictionary with ranked 'recommendations' and 'excluded' spells with reasons
+        """
+        index = self._spell_index
+
+        eligible = []
+        excluded = []
+        for row, spell in enumerate(index['spells']):
+            if caster_class not in spell['classes']:
+                continue
+            if spell.get('spell_level') and spell['spell_level'] > caster_level:
+                reason = f"Requires level {spell['spell_level']}"
+            elif target_level > spell['max_level']:
+                reason = f"Target above max level {spell['max_level']}"
+            elif spell.get('animal_only') and not is_animal:
+                reason = 'Animals only'
+            elif spell.get('undead_only') and not is_undead:
+                reason = 'Undead only'
+            else:
+                eligible.append(row)
+                continue
+            excluded.append({'id': spell['id'], 'name': spell['name'], 'reason': reason})
+
+        is_enchanter = caster_class == 'Enchanter'
+        if eligible and np is not None:
+            resist_diffs = index['resist_diff'][eligible]
+            initial = self.calculate_resist_chances(
+                caster_level, target_level, target_mr, resist_diffs, caster_charisma, is_enchanter
+            )
+            tick_save = self.calculate_resist_chances(
+                caster_level, target_level, target_mr - pet_mr_items, resist_diffs,
+                caster_charisma, is_enchanter, is_tick_save=True
+            )
+            _, _, expected_ticks = self._exact_survival_matrix(tick_save['resist_chance'], num_ticks)
+            land_chances = initial['success_chance'].tolist()
+            avg_ticks = expected_ticks[:, num_ticks - 1].tolist()
+        else:
+            land_chances = []
+            avg_ticks = []
+            for row in eligible:
+                resist_diff = index['spells'][row]['resist_diff']
+                land_chances.append(self.calculate_initial_land_chance(
+                    caster_level, target_level, target_mr, resist_diff, caster_charisma, is_enchanter
+                )['success_chance'])
+                resist_chance = self.calculate_resist_chance(
+                    caster_level, target_level, target_mr - pet_mr_items, resist_diff,
+                    caster_charisma, is_enchanter, is_tick_save=True
+                )['resist_chance']
+                avg_ticks.append(self._exact_break_distribution(resist_chance, num_ticks)['avg_ticks'])
+
+        recommendations = []
+        for row, land_chance, ticks in zip(eligible, land_chances, avg_ticks):
+            spell = index['spells'][row]
+            recommendations.append({
+                'id': spell['id'],
+                'name': spell['name'],
+                'class': caster_class,
+                'spell_level': spell.get('spell_level'),
+                'max_level': spell['max_level'],
+                'resist_diff': spell['resist_diff'],
+                'land_chance': land_chance,
+                'expected_duration_seconds': round(ticks * 6, 1),
+                'expected_duration_minutes': round(ticks * 6 / 60, 2),
+            })
+        recommendations.sort(key=lambda spell: (-spell['land_chance'], -spell['expected_duration_seconds']))
+        for rank, spell in enumerate(recommendations, start=1):
+            spell['rank'] = rank
+
+        return {
+            'recommendations': recommendations,
+            'excluded': excluded,
+            'num_ticks': num_ticks,
+        }
+
+    def solve_minimum(self, scenario: Dict, parameter: str, low: int, high: int,
+                      metric: str, target: float, percentile: int = 50) -> Dict:
+        """
+        Find the smallest parameter value that meets a target.
+
+        Land chance and every duration statistic are non-decreasing in
+        caster_charisma and pet_mr_items (more CHA or -MR only ever lowers the
+        resist chance), so the answer is found by bisection over the exact
+        model in O(log(high - low)) evaluations.
+
+        Args:
+            scenario: Fixed calculate arguments (as for calculate_batch)
+            parameter: Input to search over (see SOLVE_PARAMETERS)
+            low: Smallest value to consider
+            high: Largest value to consider
+            metric: 'land_chance' (percent), 'expected_duration' or
+                'percentile_duration' (seconds)
+            target: Minimum acceptable metric value
+            percentile: Percentile for 'percentile_duration' (50, 90, 95 or 99)
+
+        Returns:
+            Dictionary with the minimum value (None if the target is not
+            achievable within [low, high]) and the metric it achieves
+        """
+        if parameter not in self.SOLVE_PARAMETERS:
+            raise ValueError(f"Cannot solve for '{parameter}', expected one of {', '.join(self.SOLVE_PARAMETERS)}")
+        if metric not in self.SOLVE_METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {', '.join(self.SOLVE_METRICS)}")
+        if metric == 'percentile_duration' and percentile not in (50, 90, 95, 99):
+            raise ValueError("Percentile must be 50, 90, 95 or 99")
+        if low > high:
+            raise ValueError("Search range is empty")
+
+        params = {'pet_mr_items': 0, 'caster_charisma': 75, 'is_enchanter': True, 'num_ticks': 100, **scenario}
+        evaluated = {}
+
+        def evaluate(value: int) -> float:
+            if value not in evaluated:
+                trial = {**params, parameter: value}
+                if metric == 'land_chance':
+                    evaluated[value] = self.calculate_initial_land_chance(
+                        trial['caster_level'], trial['target_level'], trial['target_mr'], trial['resist_diff'],
+                        trial['caster_charisma'], trial['is_enchanter']
+                    )['success_chance']
+                else:
+                    resist_chance = self.calculate_resist_chance(
+                        trial['caster_level'], trial['target_level'], trial['target_mr'] - trial['pet_mr_items'],
+                        trial['resist_diff'], trial['caster_charisma'], trial['is_enchanter'], is_tick_save=True
+                    )['resist_chance']
+                    distribution = self._exact_break_distribution(resist_chance, trial['num_ticks'])
+                    if metric == 'expected_duration':
+                        evaluated[value] = round(distribution['avg_ticks'] * 6, 1)
+                    else:
+                        evaluated[value] = distribution['percentile_ticks'][percentile] * 6
+            return evaluated[value]
+
+        best = evaluate(high)
+        if best < target:
+            value = None
+        elif evaluate(low) >= target:
+            value = low
+        else:
+            # Invariant: evaluate(low) < target <= evaluate(high)
+            while high - low > 1:
+                middle = (low + high) // 2
+                if evaluate(middle) >= target:
+                    high = middle
+                else:
+                    low = middle
+            value = high
+
+        return {
+            'parameter': parameter,
+            'metric': metric,
+            'percentile': percentile if metric == 'percentile_duration' else None,
+            'target': target,
+            'achievable': value is not None,
+            'value': value,
+            'achieved': evaluate(value) if value is not None else None,
+            'best_achievable': best,
+            'evaluations': len(evaluated),
+        }
+
+    def calculate_session(self, caster_level: int, target_level: int, target_mr: int,
+                          resist_diff: int, caster_charisma: int = 75, is_enchanter: bool = True,
+                          pet_mr_items: int = 0, duration_ticks: Optional[int] = None,
+                          mana_cost: int = 0, recast_delay_ticks: int = 0,
+                          horizon_ticks: int = 600) -> Dict:
+        """
+        Expected pet uptime, recharms and mana over a whole encounter.
+
+        The caster recharms whenever the pet is free: each cast attempt takes
+        one tick and lands with the initial land chance; a landed charm then
+        makes a tick save every tick and ends when it breaks or, after
+        duration_ticks, wears off. Failed casts and ended charms wait
+        recast_delay_ticks before the next attempt.
+
+        This is a Markov chain over ticks evaluated exactly (no sampling).
+        All charmed states share the same break chance, so the charmed
+        age distribution never needs to be stored: the chain keeps the
+        total charmed probability plus the probability landed on each tick,
+        which is what wears off duration_ticks later. Each tick is O(1), so
+        an hour (600 ticks) takes well under a millisecond.
+
+        Args:
+            caster_level: Level of the caster
+            target_level: Level of the target
+            target_mr: Magic resist of the target
+            resist_diff: Resist modifier of the spell
+            caster_charisma: Charisma of the caster
+            is_enchanter: Whether the caster is an enchanter
+            pet_mr_items: -MR from debuffs and pet items (tick saves only)
+            duration_ticks: Spell duration in ticks (None = lasts until it breaks)
+            mana_cost: Mana spent per cast attempt
+            recast_delay_ticks: Ticks between a failed cast or ended charm and the next attempt
+            horizon_ticks: Length of the encounter in ticks (1 tick = 6 seconds)
+
+        Returns:
+            Dictionary with expected uptime, casts, landed charms, breaks, expirations and mana
+        """
+        land_chance = self.calculate_initial_land_chance(
+            caster_level, target_level, target_mr, resist_diff, caster_charisma, is_enchanter
+        )['success_chance'] / 100.0
+        tick_save = self.calculate_resist_chance(
+            caster_level, target_level, target_mr - pet_mr_items, resist_diff,
+            caster_charisma, is_enchanter, is_tick_save=True
+        )
+        p = self.tick_break_chance(tick_save['resist_chance'])
+        q = 1.0 - p
+
+        # A charm that survives max_age tick saves wears off
+        max_age = duration_ticks if duration_ticks else horizon_ticks
+        surviving_full_duration = q ** max_age
+
+        ready = [0.0] * (horizon_ticks + recast_delay_ticks + 1)  # probability of casting on each tick
+        ready[0] = 1.0
+        landed = [0.0] * horizon_ticks  # probability a charm landed on each tick
+        charmed = 0.0  # probability the pet is charmed during the current tick
+
+        uptime_ticks = casts = breaks = expirations = 0.0
+        for tick in range(horizon_ticks):
+            uptime_ticks += charmed
+            broke = charmed * p
+            expired = landed[tick - max_age] * surviving_full_duration if tick >= max_age else 0.0
+
+            casting = ready[tick]
+            landed[tick] = casting * land_chance
+            casts += casting
+            breaks += broke
+            expirations += expired
+
+            ready[tick + 1 + recast_delay_ticks] += broke + expired + casting - landed[tick]
+            charmed = max(0.0, charmed * q - expired) + landed[tick]
+
+        charms_landed = sum(landed)
+        return {
+            'land_chance': round(land_chance * 100, 2),
+            'tick_save_resist_chance': tick_save['resist_chance'],
+            'horizon_seconds': horizon_ticks * 6,
+            'duration_ticks': duration_ticks,
+            'recast_delay_seconds': recast_delay_ticks * 6,
+            'expected_uptime_seconds': round(uptime_ticks * 6, 1),
+            'uptime_percent': round(uptime_ticks / horizon_ticks * 100, 2),
+            'expected_casts': round(casts, 3),
+            'expected_charms_landed': round(charms_landed, 3),
+            'expected_failed_casts': round(casts - charms_landed, 3),
+            'expected_breaks': round(breaks, 3),
+            'expected_expirations': round(expirations, 3),
+            'expected_mana': round(casts * mana_cost, 1),
+            'charmed_at_end_percent': round(charmed * 100, 2),
+        }
+
+    def calculate_long_horizon(self, caster_level: int, target_level: int, target_mr: int,
+                               resist_diff: int, caster_charisma: int = 75, is_enchanter: bool = True,
+                               num_ticks: int = 100000, num_points: int = 200,
+                               spacing: str = 'log') -> Dict:
+        """
+        Exact break curve over a very long horizon, reported at a bounded number of ticks.
+
+        Works in log space: P(still held after t ticks) is exp(t * log1p(-p)),
+        so the curve, the expected duration ((1 - q^n) / p) and the
+        percentiles (the first t with q^t <= 1 - x) all come out in closed
+        form without walking every tick, and survival probabilities far below
+        the float range are still reported through log10_prob_held. Cost and
+        response size depend on num_points, not num_ticks.
+
+        Args:
+            caster_level: Level of the caster
+            target_level: Level of the target
+            target_mr: Magic resist of the target (after pet -MR items)
+            resist_diff: Spell resist modifier
+            caster_charisma: Charisma of caster
+            is_enchanter: Whether the caster is an enchanter
+            num_ticks: Horizon in ticks (1 tick = 6 seconds)
+            num_points: Most ticks to report on the curve (the first and last tick are always included)
+            spacing: 'log' for log-spaced ticks or 'uniform' for evenly spaced ones
+
+        Returns:
+            Dictionary with the sampled tick_series, expected duration, duration percentiles
+            and the chance of lasting the full horizon
+        """
+        if spacing not in self.CURVE_SPACINGS:
+            raise ValueError(f"Spacing must be one of: {', '.join(self.CURVE_SPACINGS)}")
+
+        resist_info = self.calculate_resist_chance(
+            caster_level, target_level, target_mr, resist_diff,
+            caster_charisma, is_enchanter, is_tick_save=True
+        )
+        p = self.tick_break_chance(resist_info['resist_chance'])
+        log_q = log1p(-p)
+
+        ticks = self._curve_ticks(num_ticks, num_points, spacing)
+        expected_ticks = -expm1(num_ticks * log_q) / p if p > 0 else float(num_ticks)
+
+        percentile_ticks = {}
+        for point in (50, 90, 95, 99):
+            if p <= 0:
+                percentile_ticks[point] = num_ticks
+                continue
+            # First tick where 1 - q^t >= x; nudge for rounding at the boundary
+            tick = max(1, ceil(log1p(-point / 100.0) / log_q))
+            if tick > 1 and -expm1((tick - 1) * log_q) >= point / 100.0:
+                tick -= 1
+            elif -expm1(tick * log_q) < point / 100.0:
+                tick += 1
+            percentile_ticks[point] = min(tick, num_ticks)
+
+        log10_held_at_end = num_ticks * log_q / log(10)
+        duration_stats = {}
+        for name, point in (('median', 50), ('p90', 90), ('p95', 95), ('p99', 99)):
+            duration_stats[f'{name}_seconds'] = percentile_ticks[point] * 6
+            duration_stats[f'{name}_minutes'] = round(percentile_ticks[point] * 6 / 60, 2)
+
+        return {
+            'single_tick_break_probability': round(p * 100, 2),
+            'resist_info': resist_info,
+            'tick_series': {
+                'ticks': ticks,
+                'seconds_per_tick': 6,
+                'prob_broke': [round(-expm1(tick * log_q) * 100, 2) for tick in ticks],
+                'log10_prob_held': [round(tick * log_q / log(10), 4) for tick in ticks],
+            },
+            'expected_duration_seconds': round(expected_ticks * 6, 1),
+            'expected_duration_minutes': round(expected_ticks * 6 / 60, 2),
+            'duration_stats': duration_stats,
+            'percent_lasting_full_duration': round(exp(num_ticks * log_q) * 100, 2),
+            'log10_prob_lasting_full_duration': round(log10_held_at_end, 4),
+            'num_ticks': num_ticks,
+            'spacing': spacing,
+            'engine': 'exact',
+        }
+
+    @staticmethod
+    def _curve_ticks(num_ticks: int, num_points: int, spacing: str) -> List[int]:
+        """Up to num_points ticks from 1 to num_ticks, evenly or logarithmically spaced."""
+        if num_points >= num_ticks:
+            return list(range(1, num_ticks + 1))
+        if num_points < 2:
+            return [num_ticks]
+        if spacing == 'uniform':
+            step = (num_ticks - 1) / (num_points - 1)
+            ticks = {1 + round(i * step) for i in range(num_points)}
+        else:
+            # Rounding merges the densest low ticks, so log spacing can return fewer points
+            ratio = log(num_ticks) / (num_points - 1)
+            ticks = {round(exp(i * ratio)) for i in range(num_points)}
+        ticks.update((1, num_ticks))
+        return sorted(ticks)
+
+    def calculate_sensitivity(self, scenario: Dict) -> Dict:
+        """
+        Effect of a +1 and -1 step in each input on land chance and expected duration.
+
+        The base scenario and every perturbed copy (see SENSITIVITY_PARAMETERS)
+        are evaluated together: resist chances in one vectorized call per
+        check type (with NumPy) and exact durations once per distinct
+        tick-save resist chance. Steps that leave the accepted input range
+        (PARAMETER_RANGES, e.g. -1 pet MR items or CHA above 300) are
+        reported as None.
+
+        The result also describes the nearby discontinuities that make the
+        response non-linear: the enchanter CHA bonus only moves every 8
+        points, targets 51+ cap the level difference, the Six Level Rule
+        makes the charm unlandable past a target level, and at the resist
+        floor lowering the resist chance further does nothing.
+
+        Args:
+            scenario: Calculate arguments (as for calculate_batch)
+
+        Returns:
+            Dictionary with the base values, per-input 'effects' (deltas for
+            'plus_one' and 'minus_one') and 'discontinuities'
+        """
+        params = {'pet_mr_items': 0, 'caster_charisma': 75, 'is_enchanter': True, 'num_ticks': 100, **scenario}
+        steps = [(None, 0)] + [(parameter, step) for parameter in self.SENSITIVITY_PARAMETERS for step in (1, -1)]
+        rows = [{**params, parameter: params[parameter] + step} if parameter else dict(params)
+                for parameter, step in steps]
+        valid = [parameter is None or parameter not in self.PARAMETER_RANGES
+                 or self.PARAMETER_RANGES[parameter][1] <= row[parameter] <= self.PARAMETER_RANGES[parameter][2]
+                 for (parameter, _), row in zip(steps, rows)]
+        rows = [row for row, ok in zip(rows, valid) if ok]
+        num_ticks = int(params['num_ticks'])
+
+        # Rows inside the resist table are evaluated in one vectorized pass;
+        # any outside it (only possible for an out-of-range base scenario) use the scalar formula
+        land_chances = [None] * len(rows)
+        initial_chances = [None] * len(rows)
+        tick_chances = [None] * len(rows)
+        table = self.resist_table
+        covered = ([i for i, row in enumerate(rows) if table.covers(row['caster_level'], row['target_level'])]
+                   if np is not None else [])
+        if covered:
+            columns = {key: [rows[i][key] for i in covered]
+                       for key in ('caster_level', 'target_level', 'target_mr', 'pet_mr_items',
+                                   'resist_diff', 'caster_charisma')}
+            initial = self.calculate_resist_chances(
+                columns['caster_level'], columns['target_level'], columns['target_mr'],
+                columns['resist_diff'], columns['caster_charisma'], params['is_enchanter']
+            )
+            tick_save = self.calculate_resist_chances(
+                columns['caster_level'], columns['target_level'],
+                np.subtract(columns['target_mr'], columns['pet_mr_items']),
+                columns['resist_diff'], columns['caster_charisma'], params['is_enchanter'], is_tick_save=True
+            )
+            for i, land_chance, initial_chance, tick_chance in zip(
+                    covered, initial['success_chance'].tolist(), initial['resist_chance'].tolist(),
+                    tick_save['resist_chance'].tolist()):
+                land_chances[i], initial_chances[i], tick_chances[i] = land_chance, initial_chance, tick_chance
+
+        for i in sorted(set(range(len(rows))) - set(covered)):
+            row = rows[i]
+            initial = self.calculate_initial_land_chance(
+                row['caster_level'], row['target_level'], row['target_mr'], row['resist_diff'],
+                row['caster_charisma'], params['is_enchanter']
+            )
+            land_chances[i], initial_chances[i] = initial['success_chance'], initial['resist_chance']
+            tick_chances[i] = self.calculate_resist_chance(
+                row['caster_level'], row['target_level'], row['target_mr'] - row['pet_mr_items'],
+                row['resist_diff'], row['caster_charisma'], params['is_enchanter'], is_tick_save=True
+            )['resist_chance']
+
+        durations = {
+            resist_chance: round(self._exact_break_distribution(resist_chance, num_ticks)['avg_ticks'] * 6, 1)
+            for resist_chance in set(tick_chances)
+        }
+
+        results = iter(zip(land_chances, tick_chances))
+        evaluated = [next(results) if ok else None for ok in valid]
+        base_land, base_tick = evaluated[0]
+        base_duration = durations[base_tick]
+
+        effects = {parameter: {} for parameter in self.SENSITIVITY_PARAMETERS}
+        for (parameter, step), result in zip(steps[1:], evaluated[1:]):
+            key = 'plus_one' if step > 0 else 'minus_one'
+            if result is None:
+                effects[parameter][key] = None
+                continue
+            land_chance, tick_chance = result
+            effects[parameter][key] = {
+                'land_chance': round(land_chance - base_land, 2),
+                'expected_duration_seconds': round(durations[tick_chance] - base_duration, 1),
+            }
+
+        return {
+            'base': {
+                'land_chance': base_land,
+                'expected_duration_seconds': base_duration,
+                'resist_chance': initial_chances[0],
+                'tick_save_resist_chance': base_tick,
+            },
+            'effects': effects,
+            'discontinuities': self._sensitivity_discontinuities(params, initial_chances[0], base_tick),
+            'num_ticks': num_ticks,
+        }
+
+    def _sensitivity_discontinuities(self, params: Dict, resist_chance: int, tick_save_resist_chance: int) -> Dict:
+        """Where the land chance / duration response to the inputs jumps or flattens."""
+        caster_level = params['caster_level']
+        target_level = params['target_level']
+        caster_charisma = params['caster_charisma']
+
+        charisma_bonus = 0
+        next_charisma_step = None
+        if params['is_enchanter']:
+            charisma_bonus = max(0, (caster_charisma - 75) // 8)
+            next_charisma_step = 75 + 8 * (charisma_bonus + 1)
+
+        ruleset = self.ruleset
+        tick_caster_level = caster_level + ruleset.tick_save_level_bonus
+        initial_threshold = ruleset.six_level_threshold(caster_level)
+        tick_save_threshold = ruleset.six_level_threshold(tick_caster_level)
+
+        # Lowest caster level whose initial cast is not blocked by the Six Level Rule
+        min_caster_level = 1 if not ruleset.six_level_rule else next(
+            (level for level in range(1, self.resist_table.MAX_CASTER_LEVEL + 1)
+             if target_level < ruleset.six_level_threshold(level)),
+            None
+        )
+
+        return {
+            'charisma_bonus': charisma_bonus,
+            'next_charisma_step': next_charisma_step,
+            'charisma_to_next_step': next_charisma_step - caster_charisma if next_charisma_step else None,
+            'level_cap_applies': target_level >= 51,
+            'six_level_rule': {
+                'initial': initial_threshold is not None and target_level >= initial_threshold,
+                'tick_save': tick_save_threshold is not None and target_level >= tick_save_threshold,
+                'initial_target_level_threshold': initial_threshold,
+                'tick_save_target_level_threshold': tick_save_threshold,
+                'min_caster_level': min_caster_level,
+            },
+            'initial_at_floor': resist_chance <= self._resist_floor(target_level - caster_level, target_level, False),
+            'initial_at_cap': self.use_classic_resists and resist_chance >= ruleset.resist_cap,
+            'tick_save_at_floor': tick_save_resist_chance <= self.charm_min_resist,
+            'tick_save_at_cap': self.use_classic_resists and tick_save_resist_chance >= ruleset.resist_cap,
+        }
+
+    def _calculate_scenario(self, scenario: Dict) -> Dict:
+        """Calculate a single batch scenario with the scalar methods."""
+        initial_land = self.calculate_initial_land_chance(
+            scenario['caster_level'], scenario['target_level'], scenario['target_mr'],
+            scenario['resist_diff'], scenario['caster_charisma'], scenario['is_enchanter']
+        )
+        break_prob = self.calculate_charm_break_probability(
+            scenario['caster_level'], scenario['target_level'],
+            scenario['target_mr'] - scenario['pet_mr_items'], scenario['resist_diff'],
+            scenario['caster_charisma'], scenario['is_enchanter'], scenario['num_ticks'],
+            scenario['num_simulations'], scenario['engine'],
+            seed=scenario.get('seed'),
+            tolerance_seconds=scenario.get('tolerance_seconds'),
+            tolerance_percentiles=scenario.get('tolerance_percentiles', (50, 90)),
+            response_format=scenario['format']
+        )
+        return {
+            'initial_land_chance': initial_land,
+            'break_probability': break_prob
+        }
+
+    @staticmethod
+    def _resist_info_at(resist_arrays: Dict, index: int) -> Dict:
+        """Extract one scenario from calculate_resist_chances output as plain Python values."""
+        resist_chance = int(resist_arrays['resist_chance'][index])
+        return {
+            'resist_chance': resist_chance,
+            'level_mod': int(resist_arrays['level_mod'][index]),
+            'resist_modifier': int(resist_arrays['resist_modifier'][index]),
+            'leveldiff': int(resist_arrays['leveldiff'][index]),
+            'success_chance': max(0, min(100, (200 - resist_chance) / 2))
+        }
+
+
+# Process pools shared across calculations, keyed by worker count
+_process_pools = {}
+_process_pools_lock = threading.Lock()
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return a shared process pool with the given number of workers."""
+    with _process_pools_lock:
+        if workers not in _process_pools:
+            _process_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return _process_pools[workers]
+
+
+def _simulate_chunk(task: Tuple) -> List[int]:
+    """
+    Simulate one seeded chunk of charms (process pool worker).
+
+    Returns:
+        breaks_by_tick histogram of length num_ticks + 2, the last entry
+        counting charms that never broke
+    """
+    engine, resist_chance, num_ticks, num_simulations, seed, chunk_index = task
+
+    if engine == 'numpy':
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+        return CharmCalculator._numpy_break_histogram(resist_chance, num_ticks, num_simulations, rng).tolist()
+
+    rng = random.Random(f'{seed}:{chunk_index}')
+    sampler = CharmCalculator._monte_carlo_samples if engine == 'reference' else CharmCalculator._geometric_samples
+    breaks_by_tick, charms_still_active = sampler(resist_chance, num_ticks, num_simulations, rng)
+    return list(breaks_by_tick) + [charms_still_active]
@@ -8,7 +8,7 @@ To update: Run update_charm_spells.py
 """
 
 # Charm spell database
-# Format: spell_id: {name, resist_diff, max_level, classes, spell_level, ...}
+# Format: spell_id: {name, resist_diff, max_level, classes, spell_level, mana, duration_ticks, ...}
 CHARM_SPELLS = {
     245: {
         'name': 'Befriend Animal',
@@ -16,6 +16,8 @@ CHARM_SPELLS = {
         'max_level': 24,
         'classes': ['Druid'],
         'spell_level': 14,
+        'mana': 70,
+        'duration_ticks': 205,
         'animal_only': True
     },
     260: {
@@ -24,6 +26,8 @@ CHARM_SPELLS = {
         'max_level': 33,
         'classes': ['Druid'],
         'spell_level': 24,
+        'mana': 120,
+        'duration_ticks': 205,
         'animal_only': True
     },
     753: {
@@ -32,6 +36,8 @@ CHARM_SPELLS = {
         'max_level': 25,
         'classes': ['Druid'],
         'spell_level': 29,
+        'mana': 170,
+        'duration_ticks': 205,
         'animal_only': True
     },
     141: {
@@ -40,6 +46,8 @@ CHARM_SPELLS = {
         'max_level': 43,
         'classes': ['Druid'],
         'spell_level': 34,
+        'mana': 170,
+        'duration_ticks': 205,
         'animal_only': True
     },
     142: {
@@ -48,6 +56,8 @@ CHARM_SPELLS = {
         'max_level': 49,
         'classes': ['Druid'],
         'spell_level': 44,
+        'mana': 220,
+        'duration_ticks': 205,
         'animal_only': True
     },
     1553: {
@@ -56,6 +66,8 @@ CHARM_SPELLS = {
         'max_level': 53,
         'classes': ['Druid'],
         'spell_level': 52,
+        'mana': 220,
+        'duration_ticks': 205,
         'animal_only': True
     },
     3445: {
@@ -64,6 +76,8 @@ CHARM_SPELLS = {
         'max_level': 60,
         'classes': ['Druid'],
         'spell_level': 63,
+        'mana': 420,
+        'duration_ticks': 205,
         'animal_only': True
     },
     300: {
@@ -71,42 +85,54 @@ CHARM_SPELLS = {
         'resist_diff': 0,
         'max_level': 25,
         'classes': ['Enchanter'],
-        'spell_level': 12
+        'spell_level': 12,
+        'mana': 60,
+        'duration_ticks': 205
     },
     182: {
         'name': 'Beguile',
         'resist_diff': 0,
         'max_level': 37,
         'classes': ['Enchanter'],
-        'spell_level': 24
+        'spell_level': 24,
+        'mana': 120,
+        'duration_ticks': 205
     },
     183: {
         'name': 'Cajoling Whispers',
         'resist_diff': 0,
         'max_level': 46,
         'classes': ['Enchanter'],
-        'spell_level': 39
+        'spell_level': 39,
+        'mana': 195,
+        'duration_ticks': 205
     },
     184: {
         'name': 'Allure',
         'resist_diff': 0,
         'max_level': 51,
         'classes': ['Enchanter'],
-        'spell_level': 49
+        'spell_level': 49,
+        'mana': 245,
+        'duration_ticks': 205
     },
     1705: {
         'name': 'Boltran`s Agacerie',
         'resist_diff': -10,
         'max_level': 53,
         'classes': ['Enchanter'],
-        'spell_level': 53
+        'spell_level': 53,
+        'mana': 400,
+        'duration_ticks': 75
     },
     3355: {
         'name': 'Command of Druzzil',
         'resist_diff': 0,
         'max_level': 64,
         'classes': ['Enchanter'],
-        'spell_level': 64
+        'spell_level': 64,
+        'mana': 700,
+        'duration_ticks': 75
     },
     197: {
         'name': 'Beguile Undead',
@@ -114,6 +140,8 @@ CHARM_SPELLS = {
         'max_level': 46,
         'classes': ['Necromancer'],
         'spell_level': 34,
+        'mana': 170,
+        'duration_ticks': 205,
         'undead_only': True
     },
 }
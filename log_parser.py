@@ -10,12 +10,28 @@ Automatically supports all charm spells from the database:
 - Necromancer: 1 undead charm spell (Beguile Undead)
 """
 
+import io
+import mmap
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 import statistics
 from charm_spells_data import CHARM_SPELLS as CHARM_SPELLS_DB
 
+# Literal markers for the only lines the parser acts on; everything else is
+# skipped before its timestamp is parsed
+CAST_MARKER = 'begin casting'
+BREAK_MESSAGE = 'Your charm spell has worn off'
+
+# Lookup tables for the fixed EQ timestamp layout: [Sat Jan 10 12:34:56 2026]
+MONTHS = {name: number for number, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1)}
+WEEKDAYS = frozenset(('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'))
+
+# Smallest byte range worth handing to another process when parsing in parallel
+MIN_CHUNK_BYTES = 4 * 1024 * 1024
+
 
 class CharmLogParser:
     """Parse EQ log files to extract charm duration statistics."""
@@ -29,7 +45,13 @@ class CharmLogParser:
             key=len,
             reverse=True
         )
+        # One alternation for every spell; longest names come first, so
+        # "Beguile Undead" wins over "Beguile" at the same position
+        self._cast_pattern = re.compile(
+            'You begin casting (' + '|'.join(re.escape(spell) for spell in self.CHARM_SPELLS) + ')'
+        )
         self.charm_casts = {}  # spell_name -> list of (cast_time, break_time, duration)
+        self._last_timestamp = (None, None)  # (timestamp text, datetime) of the last line decoded
 
     def parse_log_content(self, log_content: str) -> Dict:
         """
@@ -41,57 +63,207 @@ class CharmLogParser:
         Returns:
             Dictionary with statistics per spell and overall
         """
-        lines = log_content.split('\n')
+        return self.parse_stream(io.StringIO(log_content))
+
+    def parse_file(self, file_path: str) -> Dict:
+        """
+        Parse an EQ log file line by line, without reading it into memory.
+
+        Args:
+            file_path: Path to the EQ log file
+
+        Returns:
+            Dictionary with statistics per spell and overall
+        """
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return self.parse_stream(f)
+
+    def scan_file(self, file_path: str, workers: int = 1) -> Dict:
+        """
+        Parse an EQ log file by scanning its raw bytes for charm events.
+
+        The file is memory-mapped and searched for the cast and break
+        markers; only the lines containing them are decoded. Everything else
+        is never turned into Python strings, so large logs parse at close to
+        page-cache speed. Gives the same results as parse_file for logs with
+        \n or \r\n line endings.
+
+        With workers > 1, a large file is split into line-aligned byte ranges
+        that are scanned in a process pool, and the chunks are stitched back
+        together in file order (see _stitch_chunks). The statistics are the
+        same as a sequential scan. When stitching cannot prove that
+        (identical cast times across a chunk boundary), the whole file is
+        rescanned sequentially, so such a log costs the parallel scan plus a
+        full sequential one.
+
+        Args:
+            file_path: Path to the EQ log file
+            workers: Processes to scan with
+
+        Returns:
+            Dictionary with statistics per spell and overall
+        """
+        with open(file_path, 'rb') as f:
+            size = f.seek(0, io.SEEK_END)
+            if size == 0:
+                return self.parse_stream(())  # mmap cannot map an empty file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                ranges = line_ranges(buffer, min(workers, size // MIN_CHUNK_BYTES))
+                if len(ranges) > 1:
+                    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+                        chunks = list(pool.map(_scan_chunk, [(file_path, start, end) for start, end in ranges]))
+                    charms = self._stitch_chunks(chunks)
+                    if charms is not None:
+                        for spell_name, cast_time, break_time in charms:
+                            self._record_charm(spell_name, cast_time, break_time)
+                        return self.calculate_statistics()
+
+                return self.parse_stream(iter_marked_lines(buffer))
+
+    def parse_stream(self, lines: Iterable[str]) -> Dict:
+        """
+        Parse log lines lazily and extract charm duration data.
+
+        Only the open casts and the completed charm durations are kept, so
+        memory stays flat however long the log is. Lines may keep their
+        trailing newline (e.g. an open file or a text stream).
 
+        Args:
+            lines: Iterable of log lines
+
+        Returns:
+            Dictionary with statistics per spell and overall
+        """
         # Track active charms per spell
         active_charms = {}  # spell_name -> cast_time
 
+        for timestamp, spell, is_break in self._charm_events(lines):
+            if spell:
+                active_charms[spell] = timestamp
+
+            # Find which charm broke (use most recent cast)
+            if is_break and active_charms:
+                spell_name = max(active_charms.keys(), key=lambda k: active_charms[k])
+                self._record_charm(spell_name, active_charms.pop(spell_name), timestamp)
+
+        return self.calculate_statistics()
+
+    def _charm_events(self, lines: Iterable[str]) -> Iterator[Tuple[datetime, Optional[str], bool]]:
+        """(timestamp, charm spell cast or None, whether a charm broke) for each charm line."""
         for line in lines:
-            # Extract timestamp
-            timestamp_match = re.search(r'\[(.*?)\]', line)
-            if not timestamp_match:
+            is_break = BREAK_MESSAGE in line
+            if not is_break and CAST_MARKER not in line:
                 continue
 
-            timestamp_str = timestamp_match.group(1)
+            timestamp = self._parse_timestamp(line)
+            if timestamp is None:
+                continue
 
-            try:
-                timestamp = datetime.strptime(timestamp_str, '%a %b %d %H:%M:%S %Y')
-            except ValueError:
-                # Try alternative format
-                try:
-                    timestamp = datetime.strptime(timestamp_str, '%c')
-                except ValueError:
+            # Check for charm spell casts
+            cast = self._cast_pattern.search(line)
+            if cast or is_break:
+                yield timestamp, cast.group(1) if cast else None, is_break
+
+    def _record_charm(self, spell_name: str, cast_time: datetime, break_time: datetime):
+        """Keep a charm's duration unless it is unreasonable (< 1 second or > 2 hours)."""
+        duration = (break_time - cast_time).total_seconds()
+        if 1 < duration < 7200:
+            if spell_name not in self.charm_casts:
+                self.charm_casts[spell_name] = []
+            self.charm_casts[spell_name].append({
+                'cast_time': cast_time,
+                'break_time': break_time,
+                'duration': duration
+            })
+
+    @staticmethod
+    def _stitch_chunks(chunks: List[Dict]) -> Optional[List[Tuple]]:
+        """
+        Combine per-chunk scans (see _scan_chunk) into the charms a sequential parse finds.
+
+        Walks the chunks in file order, carrying the casts still open at the
+        end of each one. A chunk's locally resolved breaks stand as long as
+        every carried cast is older than the casts they picked; its leading
+        breaks (made with no local cast open) are resolved against the
+        carried casts here.
+
+        Returns:
+            (spell_name, cast_time, break_time) in log order, or None if a tie
+            between carried casts makes the result depend on cast order and a
+            sequential parse is needed
+        """
+        open_casts = {}  # spell_name -> cast_time carried from earlier chunks
+        charms = []
+        for chunk_index, chunk in enumerate(chunks):
+            # A tie between local casts is only settled the same way if no carried cast could join it
+            if chunk['tied_spells'] & open_casts.keys():
+                return None
+            if open_casts and chunk['earliest_winner'] is not None \
+                    and max(open_casts.values()) >= chunk['earliest_winner']:
+                return None
+
+            for index, break_time, cast_before in chunk['leading']:
+                # Spells cast earlier in this chunk replaced the carried cast and have since broken
+                candidates = {spell: cast for spell, cast in open_casts.items() if spell not in cast_before}
+                if not candidates:
                     continue
+                latest = max(candidates.values())
+                winners = [spell for spell, cast in candidates.items() if cast == latest]
+                if len(winners) > 1:
+                    return None
+                charms.append(((chunk_index, index), winners[0], open_casts.pop(winners[0]), break_time))
 
-            # Check for charm spell casts
-            for spell in self.CHARM_SPELLS:
-                if f'begin casting {spell}' in line.lower() or f'You begin casting {spell}' in line:
-                    active_charms[spell] = timestamp
-                    break
-
-            # Check for charm breaks
-            if 'Your charm spell has worn off' in line:
-                # Find which charm broke (use most recent cast)
-                if active_charms:
-                    # Get the most recently cast charm
-                    spell_name = max(active_charms.keys(), key=lambda k: active_charms[k])
-                    cast_time = active_charms[spell_name]
-                    duration = (timestamp - cast_time).total_seconds()
-
-                    # Filter out unreasonable durations (< 1 second or > 2 hours)
-                    if 1 < duration < 7200:
-                        if spell_name not in self.charm_casts:
-                            self.charm_casts[spell_name] = []
-                        self.charm_casts[spell_name].append({
-                            'cast_time': cast_time,
-                            'break_time': timestamp,
-                            'duration': duration
-                        })
-
-                    # Remove this charm from active
-                    del active_charms[spell_name]
+            charms.extend(((chunk_index, index), spell_name, cast_time, break_time)
+                          for index, spell_name, cast_time, break_time in chunk['charms'])
+            open_casts = {spell: cast for spell, cast in open_casts.items() if spell not in chunk['cast']}
+            open_casts.update(chunk['open'])
 
-        return self.calculate_statistics()
+        charms.sort(key=lambda charm: charm[0])
+        return [charm[1:] for charm in charms]
+
+    def _parse_timestamp(self, line: str) -> Optional[datetime]:
+        """
+        Timestamp of a log line, or None if it has no readable timestamp.
+
+        EQ lines start with a fixed-width [Sat Jan 10 12:34:56 2026], so the
+        fields are sliced at fixed offsets and the month looked up in a table;
+        consecutive lines in the same second reuse the last result. Anything
+        else falls back to strptime on the first [...] in the line.
+        """
+        if line[:1] == '[' and line[25:26] == ']':
+            text = line[1:25]
+            if text == self._last_timestamp[0]:
+                return self._last_timestamp[1]
+
+            month = MONTHS.get(text[4:7])
+            if (month and text[:3] in WEEKDAYS and text[3] == ' ' and text[7] == ' ' and text[10] == ' '
+                    and text[13] == ':' and text[16] == ':' and text[19] == ' '
+                    and text[8:10].lstrip().isdigit()
+                    and (text[11:13] + text[14:16] + text[17:19] + text[20:]).isdigit()):
+                try:
+                    timestamp = datetime(int(text[20:]), month, int(text[8:10]),
+                                         int(text[11:13]), int(text[14:16]), int(text[17:19]))
+                except ValueError:
+                    timestamp = None
+                if timestamp is not None:
+                    self._last_timestamp = (text, timestamp)
+                    return timestamp
+
+        # Extract timestamp
+        timestamp_match = re.search(r'\[(.*?)\]', line)
+        if not timestamp_match:
+            return None
+
+        timestamp_str = timestamp_match.group(1)
+
+        try:
+            return datetime.strptime(timestamp_str, '%a %b %d %H:%M:%S %Y')
+        except ValueError:
+            # Try alternative format
+            try:
+                return datetime.strptime(timestamp_str, '%c')
+            except ValueError:
+                return None
 
     def calculate_statistics(self) -> Dict:
         """Calculate statistics from parsed charm data."""
@@ -159,33 +331,119 @@ class CharmLogParser:
         return f"{mins}m {secs}s"
 
 
-def parse_log_file(file_path: str) -> Dict:
+def iter_marked_lines(buffer, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """
+    Decoded lines of a bytes-like buffer that contain a cast or break marker, in order.
+
+    Uses bytes find() for each marker and only slices and decodes the line
+    around each hit. start and end limit the scan to a line-aligned byte range.
+    """
+    end = len(buffer) if end is None else end
+    cast_marker, break_marker = CAST_MARKER.encode(), BREAK_MESSAGE.encode()
+    cast_hit, break_hit = buffer.find(cast_marker, start, end), buffer.find(break_marker, start, end)
+    while cast_hit >= 0 or break_hit >= 0:
+        hit = cast_hit if break_hit < 0 or 0 <= cast_hit < break_hit else break_hit
+
+        line_start = max(start, buffer.rfind(b'\n', start, hit) + 1)
+        line_end = buffer.find(b'\n', hit, end)
+        if line_end < 0:
+            line_end = end
+        yield buffer[line_start:line_end].decode('utf-8', errors='ignore')
+
+        # Markers in this line are done; look for their next line
+        if 0 <= cast_hit < line_end:
+            cast_hit = buffer.find(cast_marker, line_end, end)
+        if 0 <= break_hit < line_end:
+            break_hit = buffer.find(break_marker, line_end, end)
+
+
+def line_ranges(buffer, chunks: int) -> List[Tuple[int, int]]:
+    """Split a buffer into at most chunks (start, end) byte ranges that begin at line starts."""
+    size = len(buffer)
+    boundaries = [0]
+    for chunk in range(1, max(1, chunks)):
+        newline = buffer.find(b'\n', size * chunk // chunks)
+        boundary = newline + 1 if newline >= 0 else size
+        if boundaries[-1] < boundary < size:
+            boundaries.append(boundary)
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _scan_chunk(task: Tuple[str, int, int]) -> Dict:
+    """
+    Scan one byte range of a log (runs in a worker process) starting with no open casts.
+
+    Returns:
+        Dictionary with the charms resolved inside the range, its leading
+        breaks (with the spells cast before each), the casts still open at
+        the end, every spell cast, the oldest cast a local break picked, and
+        the spells a local break had to pick between by cast order (identical cast times)
+    """
+    file_path, start, end = task
+    parser = CharmLogParser()
+
+    active_charms = {}
+    cast, broken = set(), set()
+    charms, leading = [], []
+    earliest_winner, tied_spells = None, set()
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        events = parser._charm_events(iter_marked_lines(buffer, start, end))
+        for index, (timestamp, spell, is_break) in enumerate(events):
+            if spell:
+                active_charms[spell] = timestamp
+                cast.add(spell)
+            if not is_break:
+                continue
+
+            if active_charms:
+                latest = max(active_charms.values())
+                tied = [spell for spell, cast_time in active_charms.items() if cast_time == latest]
+                if len(tied) > 1:
+                    # Spells that broke earlier in the range sit in the same dict order as a sequential parse
+                    tied_spells.update(set(tied) - broken)
+                spell_name = max(active_charms.keys(), key=lambda k: active_charms[k])
+                broken.add(spell_name)
+                charms.append((index, spell_name, active_charms.pop(spell_name), timestamp))
+                earliest_winner = latest if earliest_winner is None else min(earliest_winner, latest)
+            else:
+                leading.append((index, timestamp, frozenset(cast)))
+
+    return {
+        'charms': charms,
+        'leading': leading,
+        'open': active_charms,
+        'cast': cast,
+        'earliest_winner': earliest_winner,
+        'tied_spells': tied_spells,
+    }
+
+
+def parse_log_file(file_path: str, workers: int = 1) -> Dict:
     """
     Parse an EQ log file and return charm duration statistics.
 
     Args:
         file_path: Path to the EQ log file
+        workers: Processes to split a large file across
 
     Returns:
         Dictionary with charm duration statistics
     """
     parser = CharmLogParser()
-
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-
-    return parser.parse_log_content(content)
+    return parser.scan_file(file_path, workers)
 
 
 if __name__ == '__main__':
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python log_parser.py <path_to_eq_log_file>")
+        print("Usage: python log_parser.py <path_to_eq_log_file> [workers]")
         sys.exit(1)
 
     log_file = sys.argv[1]
-    stats = parse_log_file(log_file)
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    stats = parse_log_file(log_file, workers)
 
     print("=" * 60)
     print("EverQuest Charm Duration Analysis")
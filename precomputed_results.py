@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Quarm Charm Calculator - Precomputed Results
+
+Builds and reads a binary artifact holding exact land chances and expected
+durations for the whole input domain, so the web server can answer lookups
+from a memory-mapped file without running the calculator.
+
+Both results only depend on the caster level, the target level and an
+"effective MR": target_mr + resist_diff - CHA bonus for the initial cast,
+target_mr - pet_mr_items + resist_diff for tick saves. The artifact stores
+one (caster_level, target_level, effective_mr) grid of land chances and one
+grid of expected durations per num_ticks, so every spell, CHA and -MR item
+combination maps onto a single array index.
+
+To build: make precompute (or python3 precomputed_results.py --help)
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed to build the artifact, not to read it
+    np = None
+
+from charm_calculator import CharmCalculator
+from rulesets import DEFAULT_RULESET, get_ruleset
+
+
+# File layout: MAGIC, format version and header length, the JSON header,
+# then little-endian arrays (uint8 land chance in half percent, uint16
+# expected duration in tenths of a second), each aligned to 8 bytes
+MAGIC = b'QCCR'
+FORMAT_VERSION = 1
+PREFIX = struct.Struct('<4sII')
+
+DEFAULT_PATH = 'precomputed_results.bin'
+DEFAULT_NUM_TICKS = (100, 200)
+
+
+def _rules(calculator: CharmCalculator):
+    """Ruleset settings the artifact was built with."""
+    return list(calculator.ruleset.rules)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def build_artifact(path: str = DEFAULT_PATH, calculator: Optional[CharmCalculator] = None,
+                   num_ticks=DEFAULT_NUM_TICKS, caster_levels=(1, 60), target_levels=(1, 65),
+                   target_mrs=(-200, 500), max_charisma: int = 300,
+                   max_pet_mr_items: int = 200) -> Dict:
+    """
+    Precompute land chance and expected duration for a slice of the input domain.
+
+    Args:
+        path: Output file
+        calculator: Calculator whose rules are used (default: a new CharmCalculator)
+        num_ticks: Horizons to store expected durations for (1-1000 ticks each)
+        caster_levels: Inclusive (min, max) caster level, within the resist table
+        target_levels: Inclusive (min, max) target level, within the resist table
+        target_mrs: Inclusive (min, max) target MR
+        max_charisma: Highest caster CHA that lookups must cover
+        max_pet_mr_items: Highest pet -MR that lookups must cover
+
+    Returns:
+        The artifact header
+    """
+    if np is None:
+        raise RuntimeError("Building precomputed results requires NumPy")
+
+    calculator = calculator or CharmCalculator()
+    num_ticks = sorted({int(n) for n in num_ticks})
+    if not num_ticks or not all(1 <= n <= 1000 for n in num_ticks):
+        raise ValueError("num_ticks must be between 1 and 1000")
+
+    # Every spell, CHA bonus and -MR item count folds into the effective MR axis
+    resist_diffs = [spell['resist_diff'] for spell in calculator.get_all_spells()]
+    max_cha_bonus = max(0, (max_charisma - 75) // 8)
+    mr_low = target_mrs[0] + min(resist_diffs) - max(max_cha_bonus, max_pet_mr_items)
+    mr_high = target_mrs[1] + max(resist_diffs)
+
+    caster_axis = np.arange(caster_levels[0], caster_levels[1] + 1, dtype=np.int64)
+    target_axis = np.arange(target_levels[0], target_levels[1] + 1, dtype=np.int64)
+    mr_axis = np.arange(mr_low, mr_high + 1, dtype=np.int64)
+    grid = (caster_axis[:, None, None], target_axis[None, :, None], mr_axis[None, None, :])
+
+    initial = calculator.calculate_resist_chances(*grid, 0, 75, False)
+    land = np.rint(initial['success_chance'] * 2).astype('<u1')
+
+    # Durations only depend on the tick-save resist chance; round like the API does
+    tick_save = calculator.calculate_resist_chances(*grid, 0, 75, False, is_tick_save=True)
+    unique_chances, inverse = np.unique(tick_save['resist_chance'], return_inverse=True)
+    _, _, expected_ticks = calculator._exact_survival_matrix(unique_chances, num_ticks[-1])
+
+    header = {
+        'rules': _rules(calculator),
+        'caster_levels': [int(caster_axis[0]), int(caster_axis[-1])],
+        'target_levels': [int(target_axis[0]), int(target_axis[-1])],
+        'effective_mr': [int(mr_low), int(mr_high)],
+        'num_ticks': num_ticks,
+    }
+    arrays = [('land', land)]
+    for n in num_ticks:
+        tenths = np.array([round(round(float(ticks) * 6, 1) * 10) for ticks in expected_ticks[:, n - 1]],
+                          dtype='<u2')
+        arrays.append((str(n), tenths[inverse].reshape(land.shape)))
+
+    # Header size depends on the offsets it contains, so lay out with a fixed-width guess first
+    header['offsets'] = {name: 0 for name, _ in arrays}
+    offset = _align(PREFIX.size + len(json.dumps(header)) + 16 * len(arrays))
+    for name, array in arrays:
+        header['offsets'][name] = offset
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode()
+    assert PREFIX.size + len(header_bytes) <= header['offsets']['land']
+
+    with open(path, 'wb') as f:
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays:
+            f.seek(header['offsets'][name])
+            f.write(array.tobytes())
+
+    return header
+
+
+class PrecomputedResults:
+    """Read-only, memory-mapped view of a precomputed results artifact."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_length = PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} precomputed results file")
+        self.header = json.loads(self._mmap[PREFIX.size:PREFIX.size + header_length])
+
+        self.path = path
+        self._caster_low, self._caster_high = self.header['caster_levels']
+        self._target_low, self._target_high = self.header['target_levels']
+        self._mr_low, self._mr_high = self.header['effective_mr']
+        self._mr_count = self._mr_high - self._mr_low + 1
+        self._target_count = self._target_high - self._target_low + 1
+        self._land_offset = self.header['offsets']['land']
+        self._duration_offsets = {int(n): self.header['offsets'][str(n)] for n in self.header['num_ticks']}
+
+    @classmethod
+    def load(cls, path: str) -> Optional['PrecomputedResults']:
+        """Open the artifact at path, or return None if there is no file."""
+        if not path or not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def matches(self, calculator: CharmCalculator) -> bool:
+        """Whether the artifact was built with the calculator's resist rules."""
+        return self.header['rules'] == _rules(calculator)
+
+    def _cell(self, caster_level: int, target_level: int, effective_mr: int) -> Optional[int]:
+        """Flat grid index, or None outside the precomputed slice."""
+        if not (self._caster_low <= caster_level <= self._caster_high
+                and self._target_low <= target_level <= self._target_high
+                and self._mr_low <= effective_mr <= self._mr_high):
+            return None
+        return (((caster_level - self._caster_low) * self._target_count + (target_level - self._target_low))
+                * self._mr_count + (effective_mr - self._mr_low))
+
+    def lookup(self, caster_level: int, target_level: int, target_mr: int, resist_diff: int,
+               caster_charisma: int = 75, is_enchanter: bool = True, pet_mr_items: int = 0,
+               num_ticks: int = 100) -> Optional[Dict]:
+        """
+        Land chance and expected duration for a scenario.
+
+        Returns:
+            Dictionary with land_chance and expected_duration_seconds, or None
+            if the scenario is outside the precomputed slice
+        """
+        duration_offset = self._duration_offsets.get(num_ticks)
+        if duration_offset is None:
+            return None
+
+        cha_bonus = (caster_charisma - 75) // 8 if is_enchanter and caster_charisma > 75 else 0
+        land_cell = self._cell(caster_level, target_level, target_mr + resist_diff - cha_bonus)
+        tick_cell = self._cell(caster_level, target_level, target_mr - pet_mr_items + resist_diff)
+        if land_cell is None or tick_cell is None:
+            return None
+
+        return {
+            'land_chance': self._mmap[self._land_offset + land_cell] / 2,
+            'expected_duration_seconds': struct.unpack_from('<H', self._mmap, duration_offset + 2 * tick_cell)[0] / 10,
+        }
+
+    def close(self):
+        self._mmap.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute land chance and expected duration')
+    parser.add_argument('--output', default=DEFAULT_PATH, help=f'Output file (default {DEFAULT_PATH})')
+    parser.add_argument('--num-ticks', type=int, nargs='+', default=list(DEFAULT_NUM_TICKS),
+                        help='Horizons to store durations for (default: %(default)s)')
+    parser.add_argument('--caster-levels', type=int, nargs=2, default=[1, 60], metavar=('MIN', 'MAX'))
+    parser.add_argument('--target-levels', type=int, nargs=2, default=[1, 65], metavar=('MIN', 'MAX'))
+    parser.add_argument('--target-mr', type=int, nargs=2, default=[-200, 500], metavar=('MIN', 'MAX'))
+    parser.add_argument('--ruleset', default=DEFAULT_RULESET, help='Server ruleset (default: %(default)s)')
+    args = parser.parse_args()
+
+    header = build_artifact(args.output, CharmCalculator(get_ruleset(args.ruleset)), num_ticks=args.num_ticks,
+                            caster_levels=args.caster_levels, target_levels=args.target_levels,
+                            target_mrs=args.target_mr)
+    size = os.path.getsize(args.output)
+    print(f"Wrote {args.output} ({size / 1024 / 1024:.1f} MB)")
+    print(f"  Caster levels {header['caster_levels']}, target levels {header['target_levels']}, "
+          f"effective MR {header['effective_mr']}, num_ticks {header['num_ticks']}")
@@ -0,0 +1,96 @@
+"""
+Quarm Charm Calculator - Result Cache
+
+A small in-process LRU cache for calculation results. Entries are bounded
+by count, can optionally expire after a TTL, and are dropped wholesale when
+the cache's data version changes (e.g. a different ruleset or spell data).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class ResultCache:
+    """Thread-safe, size-bounded LRU cache with optional TTL and hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None, clock=time.monotonic):
+        """
+        Args:
+            max_size: Maximum number of entries kept (0 disables caching)
+            ttl_seconds: Seconds an entry stays valid (None or 0 = no expiry)
+            clock: Monotonic time source, replaceable for testing
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds or None
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def validate(self, version: Hashable):
+        """Drop every entry if the data version differs from the one they were computed with."""
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+
+    def get(self, key: Hashable):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if self.ttl_seconds is not None and self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value):
+        """Store value under key, evicting the least recently used entries if full."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Current size, configuration and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,213 @@
+"""
+Quarm Charm Calculator - Server Rulesets
+
+EQ emulator servers differ in their resist rules: classic vs. modern
+resists, the minimum resist floors, the resist cap, the Six Level Rule and
+the charm tick save minimum. A Ruleset holds those settings together with
+the level modifier / floor formulas that use them, and lazily compiles its
+own resist table and result cache, so one process can serve several
+rulesets side by side without recomputing or mixing results.
+
+Custom rulesets can be registered in code (register_ruleset) or loaded
+from a JSON file (load_rulesets), e.g.:
+
+    [{"name": "myserver", "base": "quarm", "charm_min_resist": 10}]
+"""
+
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from resist_table import NO_FLOOR, ResistTable
+from result_cache import ResultCache
+
+
+class Ruleset:
+    """Resist rule settings for one server, with its compiled tables and cache."""
+
+    # Settings that define the rules (and so identify cached results)
+    SETTINGS = ('use_classic_resists', 'charm_min_resist', 'high_min_resist', 'between_min_resist',
+                'low_min_resist', 'resist_cap', 'six_level_rule', 'tick_save_level_bonus')
+
+    def __init__(self, name: str, description: str = '', use_classic_resists: bool = True,
+                 charm_min_resist: int = 5, high_min_resist: int = 10, between_min_resist: int = 6,
+                 low_min_resist: int = 2, resist_cap: int = 200, six_level_rule: bool = True,
+                 tick_save_level_bonus: int = 4):
+        """
+        Args:
+            name: Identifier used by the API's "ruleset" parameter
+            description: Human readable summary
+            use_classic_resists: Apply the classic floors and resist cap
+            charm_min_resist: Minimum resist chance on charm tick saves (RuleI(Spells, CharmMinResist))
+            high_min_resist: Classic floor for targets near the caster's level (SpellResistHighMinimumResistChance)
+            between_min_resist: Classic floor between the high and low cases
+            low_min_resist: Classic floor for low level / far lower targets (SpellResistLowMinimumResistChance)
+            resist_cap: Classic maximum resist chance
+            six_level_rule: Whether targets 7+ levels (or 25%+) above the caster always resist
+            tick_save_level_bonus: Levels added to the caster for tick saves
+        """
+        self.name = name
+        self.description = description
+        self.use_classic_resists = use_classic_resists
+        self.charm_min_resist = charm_min_resist
+        self.high_min_resist = high_min_resist
+        self.between_min_resist = between_min_resist
+        self.low_min_resist = low_min_resist
+        self.resist_cap = resist_cap
+        self.six_level_rule = six_level_rule
+        self.tick_save_level_bonus = tick_save_level_bonus
+
+        self._lock = threading.Lock()
+        self._resist_table = None
+        self._result_cache = None
+
+    @property
+    def rules(self) -> Tuple:
+        """The rule settings as a tuple (equal tuples give equal results)."""
+        return tuple(getattr(self, setting) for setting in self.SETTINGS)
+
+    def to_dict(self) -> Dict:
+        return {'name': self.name, 'description': self.description,
+                **{setting: getattr(self, setting) for setting in self.SETTINGS}}
+
+    def derive(self, name: str, description: str = '', **overrides) -> 'Ruleset':
+        """A new ruleset with this one's settings except for overrides."""
+        unknown = set(overrides) - set(self.SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown ruleset settings: {', '.join(sorted(unknown))}")
+        settings = {setting: getattr(self, setting) for setting in self.SETTINGS}
+        return Ruleset(name, description, **{**settings, **overrides})
+
+    def six_level_threshold(self, effective_caster_level: int) -> Optional[int]:
+        """Lowest target level the Six Level Rule applies to (None if this ruleset has no such rule)."""
+        if not self.six_level_rule:
+            return None
+        return max(effective_caster_level + 7, int(effective_caster_level * 1.25))
+
+    def level_modifier(self, effective_caster_level: int, target_level: int) -> int:
+        """Level-difference resist modifier, including the Six Level Rule."""
+        leveldiff = target_level - effective_caster_level
+        temp_level_diff = leveldiff
+
+        # NPC level difference caps for high level NPCs
+        # For NPCs level 51+, level difference is capped
+        if target_level >= 51:
+            a = 50 - effective_caster_level
+            if a > 0:
+                temp_level_diff = a
+            else:
+                temp_level_diff = 0
+
+        # Cap level difference at -9 for low targets
+        if temp_level_diff < -9:
+            temp_level_diff = -9
+
+        # Calculate base level modifier: (level_diff^2) / 2
+        level_mod = temp_level_diff * temp_level_diff // 2
+        if temp_level_diff < 0:
+            level_mod = -level_mod
+
+        # Additional resist bump for targets significantly above caster
+        if effective_caster_level < 50:
+            bump_level = effective_caster_level + 4 + effective_caster_level // 6
+            if target_level >= bump_level:
+                level_mod += 70 + effective_caster_level * 6
+        else:
+            if effective_caster_level < 64:
+                if leveldiff >= 13:
+                    level_mod = effective_caster_level * 5
+            else:
+                if leveldiff >= 16:
+                    level_mod = effective_caster_level * 5
+
+        # Apply the Six Level Rule (Quarm specific)
+        # If target is 7+ levels or 25%+ higher than caster, massive resist bonus
+        threshold = self.six_level_threshold(effective_caster_level)
+        if threshold is not None and target_level >= threshold:
+            level_mod = 1000  # Effectively unresistable
+
+        return level_mod
+
+    def resist_floor(self, leveldiff: int, target_level: int, is_tick_save: bool) -> int:
+        """Minimum resist chance for a check (NO_FLOOR when none applies)."""
+        # Charm-specific minimum resist chance on tick saves
+        if is_tick_save:
+            return self.charm_min_resist
+
+        # Classic resist minimum floors (applied to non-tick saves in classic)
+        if self.use_classic_resists:
+            # NPCs have minimum resist chances based on level difference
+            if leveldiff > -11 and target_level > 14:
+                return self.high_min_resist
+            elif leveldiff < -20 or target_level < 15:
+                return self.low_min_resist
+            else:
+                return self.between_min_resist
+
+        return NO_FLOOR
+
+    @property
+    def resist_table(self) -> ResistTable:
+        """Level modifier and floor table for this ruleset, compiled on first use."""
+        if self._resist_table is None:
+            with self._lock:
+                if self._resist_table is None:
+                    self._resist_table = ResistTable(self)
+        return self._resist_table
+
+    def result_cache(self, max_size: int = 1024, ttl_seconds: Optional[float] = None) -> ResultCache:
+        """This ruleset's result cache, created with the given settings on first use."""
+        if self._result_cache is None:
+            with self._lock:
+                if self._result_cache is None:
+                    self._result_cache = ResultCache(max_size, ttl_seconds)
+        return self._result_cache
+
+
+QUARM = Ruleset(
+    'quarm', 'Project Quarm (EQMacEmu): classic resists, charm tick saves resist at least 5, Six Level Rule'
+)
+P99 = QUARM.derive(
+    'p99', 'P99-style classic rules: classic floors and cap, without the Quarm Six Level Rule',
+    six_level_rule=False
+)
+
+DEFAULT_RULESET = QUARM.name
+RULESETS = {ruleset.name: ruleset for ruleset in (QUARM, P99)}
+
+
+def register_ruleset(ruleset: Ruleset) -> Ruleset:
+    """Make a ruleset available by name (replacing any with the same name)."""
+    RULESETS[ruleset.name] = ruleset
+    return ruleset
+
+
+def get_ruleset(name: Optional[str] = None) -> Ruleset:
+    """
+    Look up a registered ruleset.
+
+    Raises:
+        ValueError: If no ruleset has that name
+    """
+    ruleset = RULESETS.get(name or DEFAULT_RULESET)
+    if ruleset is None:
+        raise ValueError(f"Unknown ruleset '{name}', expected one of {', '.join(RULESETS)}")
+    return ruleset
+
+
+def load_rulesets(path: str) -> List[Ruleset]:
+    """
+    Register custom rulesets from a JSON list of definitions.
+
+    Each definition has a "name", an optional "description" and "base"
+    ruleset (default quarm) and any settings that differ from the base.
+    """
+    with open(path, 'r') as f:
+        definitions = json.load(f)
+
+    loaded = []
+    for definition in definitions:
+        definition = dict(definition)
+        base = get_ruleset(definition.pop('base', DEFAULT_RULESET))
+        loaded.append(register_ruleset(base.derive(**definition)))
+    return loaded
@@ -5,7 +5,19 @@ Test script for Quarm Charm Calculator
 Tests the calculation logic to ensure it matches EQMacEmu behavior.
 """
 
+import io
+import os
+import random
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+from itertools import accumulate
+
 from charm_calculator import CharmCalculator
+from log_parser import CharmLogParser, _scan_chunk, iter_marked_lines, line_ranges, parse_log_file
+from result_cache import ResultCache
+from precomputed_results import FORMAT_VERSION, MAGIC, PREFIX, PrecomputedResults, build_artifact
+from rulesets import P99, QUARM, get_ruleset
 
 
 def test_basic_calculation():
@@ -169,6 +181,782 @@ def test_basic_calculation():
     print("=" * 60)
 
 
+def test_exact_engine_matches_monte_carlo():
+    """The exact engine should agree with a large Monte Carlo run."""
+    calc = CharmCalculator()
+    args = dict(caster_level=60, target_level=55, target_mr=50, resist_diff=-50,
+                caster_charisma=200, num_ticks=100)
+
+    exact = calc.calculate_charm_break_probability(**args)
+    sampled = calc.calculate_charm_break_probability(
+        **args, num_simulations=20000, engine='monte_carlo', seed=3
+    )
+
+    assert exact['engine'] == 'exact'
+    assert len(exact['tick_probabilities']) == len(sampled['tick_probabilities']) == 100
+    assert abs(exact['expected_duration_seconds'] - sampled['expected_duration_seconds']) < 15
+    assert abs(exact['percent_lasting_full_duration'] - sampled['percent_lasting_full_duration']) < 2
+    for exact_tick, sampled_tick in zip(exact['tick_probabilities'], sampled['tick_probabilities']):
+        assert abs(exact_tick['prob_broke'] - sampled_tick['prob_broke']) < 2
+    assert abs(exact['duration_stats']['median_seconds'] - sampled['duration_stats']['median_seconds']) <= 12
+
+
+def test_exact_engine_is_deterministic():
+    """Exact results contain no sampling noise."""
+    calc = CharmCalculator()
+    first = calc.calculate_charm_break_probability(60, 60, 100, -200, 200, num_ticks=200)
+    second = calc.calculate_charm_break_probability(60, 60, 100, -200, 200, num_ticks=200)
+    assert first == second
+    held = [tick['prob_held'] for tick in first['tick_probabilities']]
+    assert held == sorted(held, reverse=True)
+
+    # The reported per-tick chance is the one the curve is built from, in single and batch responses
+    tick_chance = round(calc.tick_break_chance(first['resist_info']['resist_chance']) * 100, 2)
+    assert first['single_tick_break_probability'] == tick_chance
+    batch = calc.calculate_batch([dict(caster_level=60, target_level=60, target_mr=100, resist_diff=-200,
+                                       caster_charisma=200, num_ticks=200)])[0]['break_probability']
+    assert batch['single_tick_break_probability'] == tick_chance
+    assert round(100 - first['tick_probabilities'][0]['prob_held'], 2) == tick_chance
+
+
+def test_numpy_engine_matches_exact():
+    """The vectorized sampler should agree with the exact model."""
+    calc = CharmCalculator()
+    if 'numpy' not in calc.ENGINES:
+        return
+    args = dict(caster_level=20, target_level=18, target_mr=25, resist_diff=-30,
+                caster_charisma=100, num_ticks=150)
+
+    exact = calc.calculate_charm_break_probability(**args)
+    sampled = calc.calculate_charm_break_probability(**args, num_simulations=50000, engine='numpy', seed=5)
+
+    assert sampled['engine'] == 'numpy'
+    assert sampled['num_simulations'] == 50000
+    assert len(sampled['tick_probabilities']) == 150
+    assert abs(exact['expected_duration_seconds'] - sampled['expected_duration_seconds']) < 10
+    assert abs(exact['duration_stats']['p90_seconds'] - sampled['duration_stats']['p90_seconds']) <= 30
+    assert sampled['duration_stats']['max_seconds'] == 150 * 6
+    for exact_tick, sampled_tick in zip(exact['tick_probabilities'], sampled['tick_probabilities']):
+        assert abs(exact_tick['prob_broke'] - sampled_tick['prob_broke']) < 1.5
+
+
+def test_resist_table_matches_formula():
+    """Table-backed resist chances should match the level formula everywhere."""
+    calc = CharmCalculator()
+    table = calc.resist_table
+
+    for is_tick_save in (False, True):
+        for caster_level in range(1, table.MAX_CASTER_LEVEL + 1):
+            effective_caster_level = caster_level + 4 if is_tick_save else caster_level
+            for target_level in range(1, table.MAX_TARGET_LEVEL + 1):
+                leveldiff = target_level - effective_caster_level
+                assert table.lookup(caster_level, target_level, is_tick_save) == (
+                    calc._level_modifier(effective_caster_level, target_level),
+                    calc._resist_floor(leveldiff, target_level, is_tick_save),
+                )
+
+    if 'numpy' not in calc.ENGINES:
+        return
+    import numpy as np
+
+    caster_levels, target_levels = np.meshgrid(np.arange(1, 61), np.arange(1, 66), indexing='ij')
+    for is_tick_save in (False, True):
+        vectorized = calc.calculate_resist_chances(
+            caster_levels, target_levels, 35, -10, 200, True, is_tick_save
+        )
+        for caster_level in (1, 14, 20, 46, 50, 51, 60):
+            for target_level in (1, 14, 15, 30, 51, 55, 60, 65):
+                scalar = calc.calculate_resist_chance(
+                    caster_level, target_level, 35, -10, 200, True, is_tick_save
+                )
+                for key, value in scalar.items():
+                    assert vectorized[key][caster_level - 1, target_level - 1] == value
+
+
+def test_batch_matches_single_calculations():
+    """Batch results should equal individual calls, in input order."""
+    calc = CharmCalculator()
+    scenarios = [
+        dict(caster_level=60, target_level=55, target_mr=50, resist_diff=-50, caster_charisma=200),
+        dict(caster_level=60, target_level=60, target_mr=100, resist_diff=-200, caster_charisma=200,
+             pet_mr_items=30, num_ticks=250),
+        dict(caster_level=20, target_level=18, target_mr=25, resist_diff=-30, caster_charisma=100,
+             is_enchanter=False, num_ticks=1),
+        dict(caster_level=50, target_level=64, target_mr=50, resist_diff=-50, num_ticks=40),
+    ]
+
+    results = calc.calculate_batch(scenarios)
+
+    assert len(results) == len(scenarios)
+    for scenario, result in zip(scenarios, results):
+        pet_mr_items = scenario.pop('pet_mr_items', 0)
+        num_ticks = scenario.pop('num_ticks', 100)
+        assert result['initial_land_chance'] == calc.calculate_initial_land_chance(**scenario)
+        scenario['target_mr'] -= pet_mr_items
+        assert result['break_probability'] == calc.calculate_charm_break_probability(
+            **scenario, num_ticks=num_ticks
+        )
+
+
+def test_grid_matches_single_calculations():
+    """Every grid cell should match the scalar land chance and exact duration."""
+    calc = CharmCalculator()
+    if 'numpy' not in calc.ENGINES:
+        return
+
+    grid = calc.calculate_grid(
+        dict(caster_level=60, target_level=55, resist_diff=-10, pet_mr_items=20, num_ticks=150),
+        'target_mr', range(-50, 201, 25), 'caster_charisma', (75, 150, 255)
+    )
+
+    assert grid['shape'] == [11, 3]
+    cells = iter(zip(grid['land_chance'], grid['expected_duration_seconds']))
+    for target_mr in grid['x']['values']:
+        for caster_charisma in grid['y']['values']:
+            land_chance, expected_seconds = next(cells)
+            assert land_chance == calc.calculate_initial_land_chance(
+                60, 55, target_mr, -10, caster_charisma)['success_chance']
+            assert expected_seconds == calc.calculate_charm_break_probability(
+                60, 55, target_mr - 20, -10, caster_charisma, num_ticks=150)['expected_duration_seconds']
+
+
+def test_result_cache_eviction_ttl_and_invalidation():
+    """The result cache evicts LRU entries, expires old ones and clears on version change."""
+    now = [0.0]
+    cache = ResultCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.validate('v1')
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+    now[0] = 11.0
+    assert cache.get('a') is None
+
+    cache.put('d', 4)
+    cache.validate('v2')
+    assert cache.get('d') is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1)
+    assert (stats['expirations'], stats['invalidations']) == (1, 1)
+
+
+def test_seeded_parallel_simulation_matches_single_process():
+    """Seeded runs give identical results whatever the number of workers."""
+    calc = CharmCalculator()
+    args = dict(caster_level=60, target_level=55, target_mr=50, resist_diff=-50,
+                caster_charisma=200, num_ticks=120, num_simulations=15000, seed=1234)
+
+    for engine in calc.ENGINES:
+        if engine == 'exact':
+            continue
+        single = calc.calculate_charm_break_probability(**args, engine=engine)
+        parallel = calc.calculate_charm_break_probability(**args, engine=engine, workers=2)
+        assert single == parallel
+        assert single['num_simulations'] == 15000
+
+    other_seed = calc.calculate_charm_break_probability(**{**args, 'seed': 99}, engine='monte_carlo')
+    assert other_seed != calc.calculate_charm_break_probability(**args, engine='monte_carlo')
+
+
+def test_adaptive_simulation_stops_at_tolerance():
+    """Adaptive runs stop early once the confidence intervals are tight enough."""
+    calc = CharmCalculator()
+    args = dict(caster_level=60, target_level=55, target_mr=50, resist_diff=-50,
+                caster_charisma=200, num_ticks=200, num_simulations=100000, seed=7)
+
+    # Almost every charm breaks on the first few ticks: converges immediately
+    easy = calc.calculate_charm_break_probability(
+        1, 1, 500, 0, engine='monte_carlo', num_ticks=200, seed=7, tolerance_seconds=10
+    )
+    assert easy['confidence_interval']['converged']
+    assert easy['num_simulations'] == calc.ADAPTIVE_CHUNK_SIZE * calc.ADAPTIVE_ROUND_CHUNKS
+
+    result = calc.calculate_charm_break_probability(**args, engine='monte_carlo', tolerance_seconds=15)
+    interval = result['confidence_interval']
+    assert interval['converged']
+    assert calc.ADAPTIVE_CHUNK_SIZE * calc.ADAPTIVE_ROUND_CHUNKS < result['num_simulations'] < 100000
+    low, high = interval['avg_seconds']
+    assert high - low <= 30.2
+    assert set(interval) >= {'avg_seconds', 'median_seconds', 'p90_seconds'}
+
+    exact = calc.calculate_charm_break_probability(**args)
+    assert abs(result['expected_duration_seconds'] - exact['expected_duration_seconds']) < 30
+
+    # Rounds are the same size for any worker count, so a seed stops at the same point
+    parallel = calc.calculate_charm_break_probability(**args, engine='monte_carlo', tolerance_seconds=15, workers=2)
+    assert parallel == result
+
+    try:
+        calc.calculate_charm_break_probability(**dict(args, num_simulations=0), engine='monte_carlo',
+                                               tolerance_seconds=15)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("An adaptive run without simulations should be rejected")
+
+
+def test_histogram_percentiles_match_sorted_list():
+    """Histogram percentiles must equal the sorted-list interpolation they replace."""
+    def percentile(data, p):
+        """Original sorted-data percentile from the simulation."""
+        if not data:
+            return 0
+        k = (len(data) - 1) * (p / 100.0)
+        f = int(k)
+        c = f + 1
+        if c >= len(data):
+            return data[-1]
+        return data[f] + (k - f) * (data[c] - data[f])
+
+    rng = random.Random(3)
+    for size in (1, 2, 3, 7, 100, 1001):
+        num_ticks = rng.randint(1, 60)
+        break_times = sorted(rng.randint(1, num_ticks) for _ in range(size))
+        counts = [0] * (num_ticks + 1)
+        for tick in break_times:
+            counts[tick] += 1
+        cumulative = list(accumulate(counts))
+        for point in (0, 1, 33.3, 50, 90, 95, 99, 100):
+            assert CharmCalculator._histogram_percentile(cumulative, point) == percentile(break_times, point)
+
+
+def test_columnar_format_matches_rows():
+    """The columnar tick_series carries the same curve as the per-tick rows."""
+    calc = CharmCalculator()
+    args = dict(caster_level=60, target_level=60, target_mr=100, resist_diff=-200,
+                caster_charisma=200, num_ticks=300)
+
+    rows = calc.calculate_charm_break_probability(**args)
+    columnar = calc.calculate_charm_break_probability(**args, response_format='columnar')
+
+    assert 'tick_probabilities' not in columnar
+    series = columnar.pop('tick_series')
+    assert series['start_tick'] == 1 and series['step_ticks'] == 1 and series['seconds_per_tick'] == 6
+    assert series['prob_broke'] == [tick['prob_broke'] for tick in rows.pop('tick_probabilities')]
+    assert columnar == rows
+
+
+def test_recommend_spells_matches_single_calculations():
+    """Recommendations are eligible spells ranked by land chance, matching scalar calls."""
+    calc = CharmCalculator()
+    result = calc.recommend_spells('Enchanter', 60, 50, 40, caster_charisma=200, pet_mr_items=10, is_animal=False)
+
+    names = [spell['name'] for spell in result['recommendations']]
+    excluded = {spell['name']: spell['reason'] for spell in result['excluded']}
+    assert 'Beguile Animals' not in names and 'Beguile Animals' not in excluded  # Druid spell
+    assert excluded['Charm'].startswith('Target above max level')
+    for spell in result['recommendations']:
+        assert spell['land_chance'] == calc.calculate_initial_land_chance(
+            60, 50, 40, spell['resist_diff'], 200)['success_chance']
+        assert spell['expected_duration_seconds'] == calc.calculate_charm_break_probability(
+            60, 50, 30, spell['resist_diff'], 200)['expected_duration_seconds']
+
+    ranking = [(-spell['land_chance'], -spell['expected_duration_seconds']) for spell in result['recommendations']]
+    assert ranking == sorted(ranking)
+    assert [spell['rank'] for spell in result['recommendations']] == list(range(1, len(names) + 1))
+
+    druid = calc.recommend_spells('Druid', 60, 40, 40, is_animal=False)
+    assert druid['recommendations'] == []
+    assert {spell['reason'] for spell in druid['excluded']} >= {'Animals only'}
+
+
+def test_solve_minimum_finds_smallest_value():
+    """The solver returns the smallest value meeting the target, matching a linear scan."""
+    calc = CharmCalculator()
+    scenario = dict(caster_level=60, target_level=55, target_mr=80, resist_diff=-10, num_ticks=200)
+
+    result = calc.solve_minimum(scenario, 'pet_mr_items', 0, 200, 'percentile_duration', 180, percentile=50)
+    assert result['achievable']
+    median = lambda items: calc.calculate_charm_break_probability(
+        60, 55, 80 - items, -10, num_ticks=200)['duration_stats']['median_seconds']
+    assert median(result['value']) >= 180 > median(result['value'] - 1)
+
+    result = calc.solve_minimum(dict(scenario, target_mr=100), 'caster_charisma', 10, 300, 'land_chance', 65)
+    land = lambda cha: calc.calculate_initial_land_chance(60, 55, 100, -10, cha)['success_chance']
+    assert land(result['value']) >= 65 > land(result['value'] - 1)
+
+    # CHA never affects tick saves, so a duration target it can't reach is reported as such
+    result = calc.solve_minimum(scenario, 'caster_charisma', 10, 300, 'expected_duration', 600)
+    assert not result['achievable'] and result['value'] is None
+
+    from app import app
+    client = app.test_client()
+    payload = dict(scenario, solve_for='caster_charisma', metric='land_chance', target=65)
+    assert client.post('/api/solve', json=payload).status_code == 200
+    for metric, target in (('land_chance', 'nan'), ('land_chance', 101), ('expected_duration', 'inf'),
+                           ('expected_duration', -6)):
+        response = client.post('/api/solve', json=dict(payload, metric=metric, target=target))
+        assert response.status_code == 400
+
+
+def test_session_matches_charm_age_chain():
+    """The O(1)-per-tick session model matches a chain that tracks every charm age."""
+    calc = CharmCalculator()
+    land_chance, duration, delay, horizon = 0.8, 20, 2, 300
+    session = calc.calculate_session(60, 50, 80, 0, caster_charisma=10, pet_mr_items=40,
+                                     duration_ticks=duration, mana_cost=100,
+                                     recast_delay_ticks=delay, horizon_ticks=horizon)
+    assert session['land_chance'] == 80.0
+    p = calc.tick_break_chance(session['tick_save_resist_chance'])
+
+    # Reference: probability of being charmed at each age 1..duration
+    ready = [0.0] * (horizon + delay + 1)
+    ready[0] = 1.0
+    ages = [0.0] * (duration + 1)
+    uptime = casts = 0.0
+    for tick in range(horizon):
+        uptime += sum(ages)
+        freed = sum(ages) * p + ages[duration] * (1 - p)
+        ages = [0.0, ready[tick] * land_chance] + [mass * (1 - p) for mass in ages[1:duration]]
+        casts += ready[tick]
+        ready[tick + 1 + delay] += freed + ready[tick] * (1 - land_chance)
+
+    assert abs(session['expected_uptime_seconds'] - round(uptime * 6, 1)) < 0.2
+    assert abs(session['expected_casts'] - casts) < 1e-3
+    assert abs(session['expected_mana'] - casts * 100) < 0.1
+    assert abs(session['expected_casts'] - session['expected_charms_landed'] - session['expected_failed_casts']) < 1e-2
+
+
+def test_sensitivity_matches_single_calculations():
+    """Every reported step matches the difference of two scalar calculations."""
+    calc = CharmCalculator()
+    scenario = dict(caster_level=60, target_level=52, target_mr=60, resist_diff=-10,
+                    caster_charisma=186, pet_mr_items=10, is_enchanter=True, num_ticks=300)
+    result = calc.calculate_sensitivity(scenario)
+
+    def evaluate(params):
+        land = calc.calculate_initial_land_chance(
+            params['caster_level'], params['target_level'], params['target_mr'],
+            params['resist_diff'], params['caster_charisma'])['success_chance']
+        duration = calc.calculate_charm_break_probability(
+            params['caster_level'], params['target_level'], params['target_mr'] - params['pet_mr_items'],
+            params['resist_diff'], params['caster_charisma'], num_ticks=300)['expected_duration_seconds']
+        return land, duration
+
+    base_land, base_duration = evaluate(scenario)
+    assert result['base']['land_chance'] == base_land
+    assert result['base']['expected_duration_seconds'] == base_duration
+    for parameter in calc.SENSITIVITY_PARAMETERS:
+        for key, step in (('plus_one', 1), ('minus_one', -1)):
+            if parameter == 'caster_level' and step == 1:
+                continue  # Level 61 is out of range (checked below)
+            land, duration = evaluate(dict(scenario, **{parameter: scenario[parameter] + step}))
+            assert result['effects'][parameter][key]['land_chance'] == round(land - base_land, 2)
+            assert result['effects'][parameter][key]['expected_duration_seconds'] == round(duration - base_duration, 1)
+
+    # 186 CHA is one point short of the next CHA bonus step
+    assert result['effects']['caster_charisma']['plus_one']['land_chance'] == 0.5
+    assert result['discontinuities']['charisma_to_next_step'] == 1
+    assert result['discontinuities']['level_cap_applies']
+
+    # Steps outside the accepted input ranges are not real effects
+    assert result['effects']['caster_level']['plus_one'] is None
+    edges = calc.calculate_sensitivity(dict(scenario, pet_mr_items=0, caster_charisma=300, target_mr=500,
+                                            target_level=65, caster_level=1))
+    for parameter, key in (('pet_mr_items', 'minus_one'), ('caster_charisma', 'plus_one'),
+                           ('target_mr', 'plus_one'), ('caster_level', 'minus_one')):
+        assert edges['effects'][parameter][key] is None
+    for parameter, key in (('pet_mr_items', 'plus_one'), ('caster_charisma', 'minus_one'),
+                           ('target_mr', 'minus_one'), ('caster_level', 'plus_one')):
+        assert edges['effects'][parameter][key] is not None
+
+    # Invalid scenarios are client errors, not server errors
+    from unittest import mock
+    from app import app
+    with mock.patch.object(CharmCalculator, 'calculate_sensitivity', side_effect=ValueError('bad scenario')):
+        response = app.test_client().post('/api/sensitivity', json=scenario)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid input: bad scenario'
+
+
+def _scratch_dir(tmp_path=None):
+    """Directory for test files: pytest's tmp_path, or a new temporary directory when run as a script."""
+    return str(tmp_path) if tmp_path is not None else tempfile.mkdtemp(prefix='charm_calculator_test_')
+
+
+def test_precomputed_results_match_calculator(tmp_path=None):
+    """Lookups from a built artifact slice match the calculator exactly."""
+    from app import load_precomputed_results
+
+    # A file from another format version is ignored rather than breaking the app
+    path = os.path.join(_scratch_dir(tmp_path), 'test_precomputed_results.bin')
+    with open(path, 'wb') as f:
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION + 1, 2) + b'{}')
+    assert load_precomputed_results(path) is None
+    assert load_precomputed_results(path + '.missing') is None
+
+    calc = CharmCalculator()
+    if 'numpy' not in calc.ENGINES:
+        return
+
+    build_artifact(path, calc, num_ticks=(50, 200), caster_levels=(40, 60), target_levels=(30, 60),
+                   target_mrs=(-50, 150), max_charisma=255, max_pet_mr_items=60)
+    artifact = PrecomputedResults(path)
+    try:
+        assert artifact.matches(calc)
+        rng = random.Random(7)
+        for _ in range(500):
+            caster_level, target_level = rng.randint(40, 60), rng.randint(30, 60)
+            target_mr, resist_diff = rng.randint(-50, 150), rng.choice((0, -10))
+            caster_charisma, pet_mr_items = rng.randint(10, 255), rng.randint(0, 60)
+            is_enchanter, num_ticks = rng.random() < 0.5, rng.choice((50, 200))
+
+            result = artifact.lookup(caster_level, target_level, target_mr, resist_diff,
+                                     caster_charisma, is_enchanter, pet_mr_items, num_ticks)
+            assert result['land_chance'] == calc.calculate_initial_land_chance(
+                caster_level, target_level, target_mr, resist_diff, caster_charisma, is_enchanter)['success_chance']
+            assert result['expected_duration_seconds'] == calc.calculate_charm_break_probability(
+                caster_level, target_level, target_mr - pet_mr_items, resist_diff,
+                caster_charisma, is_enchanter, num_ticks=num_ticks)['expected_duration_seconds']
+
+        assert artifact.lookup(61, 50, 40, 0) is None
+        assert artifact.lookup(60, 50, 40, 0, num_ticks=100) is None
+    finally:
+        artifact.close()
+        os.remove(path)
+
+
+def test_rulesets_keep_separate_tables_and_caches():
+    """Each ruleset compiles its own table and cache; derived rulesets change only what they override."""
+    quarm, p99 = CharmCalculator(), CharmCalculator(get_ruleset('p99'))
+    assert quarm.ruleset is QUARM and p99.ruleset is P99
+    assert quarm.resist_table is not p99.resist_table
+    assert QUARM.result_cache() is not P99.result_cache()
+    assert quarm.cache_version != p99.cache_version
+
+    # Six Level Rule: a level 37 target is 7 levels above a level 30 caster
+    assert quarm.calculate_initial_land_chance(30, 37, 30, 0)['success_chance'] == 0
+    assert p99.calculate_initial_land_chance(30, 37, 30, 0)['success_chance'] > 0
+    assert quarm.calculate_initial_land_chance(60, 50, 30, 0) == p99.calculate_initial_land_chance(60, 50, 30, 0)
+
+    strict = CharmCalculator(QUARM.derive('strict', charm_min_resist=20, high_min_resist=15))
+    assert strict.calculate_resist_chance(60, 40, -100, 0, is_tick_save=True)['resist_chance'] == 20
+    assert strict.calculate_resist_chance(60, 55, -100, 0)['resist_chance'] == 15
+    table = strict.resist_table
+    for caster_level in (1, 30, 60):
+        for target_level in (1, 20, 51, 65):
+            for is_tick_save in (False, True):
+                effective_caster_level = caster_level + 4 if is_tick_save else caster_level
+                assert table.lookup(caster_level, target_level, is_tick_save) == (
+                    strict._level_modifier(effective_caster_level, target_level),
+                    strict._resist_floor(target_level - effective_caster_level, target_level, is_tick_save),
+                )
+
+
+def test_seeded_requests_are_reproducible():
+    """A seed makes sampled results identical call to call, and is echoed in the response."""
+    calc = CharmCalculator()
+    scenario = dict(caster_level=60, target_level=50, target_mr=60, resist_diff=0, pet_mr_items=10,
+                    num_ticks=150, num_simulations=3000, engine='monte_carlo', seed=1234)
+
+    first, second = calc.calculate_batch([scenario, scenario])
+    assert first == second
+    assert first['break_probability']['seed'] == 1234
+    assert calc.calculate_batch([dict(scenario, seed=1235)])[0] != first
+
+    exact = calc.calculate_batch([dict(scenario, engine='exact')])[0]
+    assert 'seed' not in exact['break_probability']
+
+    # Cached seeded tolerance results must be what any worker count would compute
+    from app import app, calculate_result, parse_calculate_params
+    params, error = parse_calculate_params(dict(scenario, num_simulations=100000, tolerance_seconds=3, seed=7))
+    assert error is None
+    workers = app.config['SIMULATION_WORKERS']
+    try:
+        results = []
+        for simulation_workers in (1, 2):
+            app.config['SIMULATION_WORKERS'] = simulation_workers
+            results.append(calculate_result(params))
+    finally:
+        app.config['SIMULATION_WORKERS'] = workers
+    assert results[0] == results[1]
+
+
+def test_geometric_kernel_matches_reference_distribution():
+    """The one-draw-per-charm kernel and the tick-by-tick loop both follow the exact break curve."""
+    calc = CharmCalculator()
+    num_ticks, num_simulations = 60, 40000
+    for resist_chance in (-5, 5, 60, 200):
+        exact = calc._exact_break_distribution(resist_chance, num_ticks)['prob_broke']
+        for sampler, seed in ((calc._geometric_samples, 3), (calc._monte_carlo_samples, 4)):
+            breaks_by_tick, charms_still_active = sampler(
+                resist_chance, num_ticks, num_simulations, random.Random(seed))
+            assert sum(breaks_by_tick) + charms_still_active == num_simulations
+            broke = list(accumulate(breaks_by_tick[1:]))
+            for tick in range(num_ticks):
+                assert abs(broke[tick] / num_simulations - exact[tick]) < 0.01
+
+    fast = calc.calculate_charm_break_probability(60, 50, 40, 0, num_ticks=100, engine='monte_carlo', seed=5)
+    reference = calc.calculate_charm_break_probability(60, 50, 40, 0, num_ticks=100, engine='reference', seed=5)
+    assert fast['engine'] == 'monte_carlo' and reference['engine'] == 'reference'
+    assert abs(fast['expected_duration_seconds'] - reference['expected_duration_seconds']) < 15
+
+
+def test_long_horizon_matches_exact_curve():
+    """Log-space closed forms agree with the tick-by-tick exact model and stay bounded for 1e6 ticks."""
+    calc = CharmCalculator()
+    for target_mr in (-100, 40, 300):
+        exact = calc.calculate_charm_break_probability(60, 50, target_mr, 0, num_ticks=1000,
+                                                       response_format='columnar')
+        curve = calc.calculate_long_horizon(60, 50, target_mr, 0, num_ticks=1000, num_points=1000)
+        assert curve['tick_series']['ticks'] == list(range(1, 1001))
+        assert curve['tick_series']['prob_broke'] == exact['tick_series']['prob_broke']
+        assert curve['expected_duration_seconds'] == exact['expected_duration_seconds']
+        assert curve['single_tick_break_probability'] == exact['single_tick_break_probability']
+        for name in ('median', 'p90', 'p95', 'p99'):
+            assert curve['duration_stats'][f'{name}_seconds'] == exact['duration_stats'][f'{name}_seconds']
+
+    for spacing in calc.CURVE_SPACINGS:
+        curve = calc.calculate_long_horizon(60, 50, 40, 0, num_ticks=1000000, num_points=50, spacing=spacing)
+        ticks = curve['tick_series']['ticks']
+        assert ticks[0] == 1 and ticks[-1] == 1000000 and len(ticks) <= 50
+        assert ticks == sorted(set(ticks))
+        assert curve['log10_prob_lasting_full_duration'] < -1000
+        assert curve['percent_lasting_full_duration'] == 0
+
+
+def test_target_mix_is_weighted_exact_curves():
+    """The mixture curve and duration are the weight-averaged single-target exact results."""
+    calc = CharmCalculator()
+    scenario = {'caster_level': 60, 'resist_diff': -50, 'caster_charisma': 200, 'pet_mr_items': 10, 'num_ticks': 150}
+    targets = [(50, 40, 2), (55, 100, 1), (58, 250, 1), (50, 40, 0)]
+    mix = calc.calculate_target_mix(scenario, targets)
+
+    singles = [calc.calculate_batch([{**scenario, 'target_level': level, 'target_mr': mr}])[0]
+               for level, mr, _ in targets]
+    total = sum(weight for _, _, weight in targets)
+    land = sum(weight * single['initial_land_chance']['success_chance']
+               for (_, _, weight), single in zip(targets, singles)) / total
+    duration = sum(weight * single['break_probability']['expected_duration_seconds']
+                   for (_, _, weight), single in zip(targets, singles)) / total
+    curve = [sum(weight * single['break_probability']['tick_probabilities'][tick]['prob_broke']
+                 for (_, _, weight), single in zip(targets, singles)) / total
+             for tick in range(150)]
+
+    assert mix['num_targets'] == 4
+    assert abs(mix['land_chance'] - land) < 0.01
+    assert abs(mix['expected_duration_seconds'] - duration) < 0.1
+    assert all(abs(a - b) < 0.01 for a, b in zip(mix['tick_series']['prob_broke'], curve))
+    assert [target['expected_duration_seconds'] for target in mix['targets']] == \
+        [single['break_probability']['expected_duration_seconds'] for single in singles]
+
+    for bad_weight in (float('inf'), float('nan'), -1):
+        try:
+            calc.calculate_target_mix(scenario, [(50, 40, 1), (55, 100, bad_weight)])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"Target weight {bad_weight} should be rejected")
+
+    from app import app
+    client = app.test_client()
+    for weights in ([1, 'Infinity'], [1, 'nan'], [1e308, 1e308]):
+        response = client.post('/api/target_mix', json=dict(
+            scenario, targets=[[50, 40, weights[0]], [55, 100, weights[1]]]))
+        assert response.status_code == 400
+    response = client.post('/api/target_mix', json=dict(scenario, target_levels={'50': 1}, target_mrs={'40': 'inf'}))
+    assert response.status_code == 400
+
+
+def _sample_log(num_charms=300, seed=11):
+    """A synthetic EQ log with charm casts, breaks, overlaps and unrelated chatter."""
+    rng = random.Random(seed)
+    spells = CharmLogParser().CHARM_SPELLS
+    time = datetime(2025, 12, 30, 23, 50, 0)
+    lines = []
+
+    def say(text):
+        lines.append(f"[{time.strftime('%a %b %d %H:%M:%S %Y')}] {text}")
+
+    for _ in range(num_charms):
+        say(f"You begin casting {rng.choice(spells)}.")
+        if rng.random() < 0.2:
+            time += timedelta(seconds=rng.randint(0, 10))
+            say(f"You begin casting {rng.choice(spells)}.")  # recast before the first one broke
+        for _ in range(rng.randint(0, 4)):
+            time += timedelta(seconds=rng.randint(0, 30))
+            say(rng.choice(["a gnoll hits YOU for 12 points of damage.", "Your target is out of range.",
+                            "You say, 'Hail, Guard'", "You begin casting Gate.", "You have entered Oasis."]))
+        if rng.random() < 0.1:
+            lines.append("no timestamp on this line")
+        time += timedelta(seconds=rng.choice([0, rng.randint(2, 900), 8000]))
+        if rng.random() < 0.9:
+            say("Your charm spell has worn off.")
+    return '\n'.join(lines) + '\n'
+
+
+def test_streaming_log_parse_matches_content_parse(tmp_path=None):
+    """parse_stream, parse_file and the zipped upload give the same statistics as parse_log_content."""
+    content = _sample_log()
+    expected = CharmLogParser().parse_log_content(content)
+    assert expected['total_charms_found'] > 100 and len(expected['by_spell']) > 5
+
+    # Lines are consumed lazily from any iterable
+    assert CharmLogParser().parse_stream(line for line in content.split('\n')) == expected
+
+    path = os.path.join(_scratch_dir(tmp_path), 'test_streaming_log.txt')
+    try:
+        with open(path, 'w') as f:
+            f.write(content)
+        assert CharmLogParser().parse_file(path) == expected
+        assert parse_log_file(path) == expected
+    finally:
+        os.remove(path)
+
+    from app import app
+    upload = io.BytesIO()
+    with zipfile.ZipFile(upload, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr('eqlog_Test_pq.proj.txt', content)
+    upload.seek(0)
+    response = app.test_client().post('/api/analyze_log', data={'logfile': (upload, 'eqlog.zip')})
+    assert response.get_json()['total_charms'] == expected['total_charms_found']
+    assert response.get_json()['overall']['count'] == expected['overall']['count']
+
+
+def test_log_parser_matches_longest_spell_name():
+    """Casts match the longest spell name; only our own casts and charm breaks are used."""
+    log = '\n'.join([
+        "[Sat Jan 10 12:00:00 2026] You begin casting Beguile Undead.",
+        "[Sat Jan 10 12:01:00 2026] Your charm spell has worn off.",
+        "[Sat Jan 10 12:02:00 2026] You begin casting Allure of the Wild.",
+        "[Sat Jan 10 12:02:30 2026] Soandso begins casting Charm.",
+        "[Sat Jan 10 12:03:00 2026] You say, 'begin casting Charm Animals'",
+        "[Sat Jan 10 12:04:00 2026] Your charm spell has worn off.",
+        "[Sat Jan 10 12:05:00 2026] You begin casting Beguile.",
+        "[Sat Jan 10 12:05:30 2026] You begin casting Beguile Plants.",
+        "You begin casting Charm.",
+        "[Sat Jan 10 12:06:00 2026] Your charm spell has worn off.",
+        "[Sat Jan 10 12:07:00 2026] Your charm spell has worn off.",
+    ])
+    stats = CharmLogParser().parse_log_content(log)
+
+    assert {spell: spell_stats['avg'] for spell, spell_stats in stats['by_spell'].items()} == {
+        'Beguile Undead': 60.0,
+        'Allure of the Wild': 120.0,
+        'Beguile Plants': 30.0,
+        'Beguile': 120.0,
+    }
+
+
+def test_log_timestamp_decoder_matches_strptime():
+    """The fixed-offset decoder agrees with strptime and falls back to it for other layouts."""
+    parser = CharmLogParser()
+    rng = random.Random(8)
+    for _ in range(2000):
+        moment = datetime(2001, 1, 1) + timedelta(seconds=rng.randrange(30 * 365 * 86400))
+        text = moment.strftime('%a %b %d %H:%M:%S %Y')
+        assert parser._parse_timestamp(f"[{text}] You begin casting Charm.") == moment
+        assert parser._parse_timestamp(f"[{text}] Your charm spell has worn off.") == moment  # memoized
+
+    assert parser._parse_timestamp("[Sat Jan  3 01:02:03 2026] x") == datetime(2026, 1, 3, 1, 2, 3)
+    assert parser._parse_timestamp("Guild: [Sat Jan 10 12:34:56 2026] x") == datetime(2026, 1, 10, 12, 34, 56)
+    assert parser._parse_timestamp("[Sat Feb 30 12:34:56 2026] x") is None
+    assert parser._parse_timestamp("[Sat Jan 10 25:34:56 2026] x") is None
+    assert parser._parse_timestamp("no timestamp here") is None
+
+
+def test_scan_file_matches_line_parser(tmp_path=None):
+    """The memory-mapped bytes scanner finds exactly the charm events the line parser does."""
+    path = os.path.join(_scratch_dir(tmp_path), 'test_scan_log.txt')
+    content = _sample_log(seed=12)
+    try:
+        for newline, body in (('\n', content), ('\r\n', content), ('\n', content.rstrip('\n')), ('\n', '')):
+            with open(path, 'w', newline=newline) as f:
+                f.write(body)
+            assert CharmLogParser().scan_file(path) == CharmLogParser().parse_file(path)
+        assert parse_log_file(path)['total_charms_found'] == 0
+    finally:
+        os.remove(path)
+
+    lines = list(iter_marked_lines(content.encode()))
+    assert lines == [line for line in content.split('\n') if 'begin casting' in line or 'worn off' in line]
+
+
+def test_parallel_log_scan_stitches_to_sequential_result(tmp_path=None):
+    """Chunks scanned separately and stitched in order give exactly the sequential statistics."""
+    path = os.path.join(_scratch_dir(tmp_path), 'test_parallel_log.txt')
+
+    def stitched(num_chunks):
+        with open(path, 'rb') as f:
+            ranges = line_ranges(f.read(), num_chunks)
+        parser = CharmLogParser()
+        charms = parser._stitch_chunks([_scan_chunk((path, start, end)) for start, end in ranges])
+        if charms is None:
+            return None
+        for charm in charms:
+            parser._record_charm(*charm)
+        return parser.calculate_statistics()
+
+    try:
+        # A charm open across each boundary, a break with no cast in its own chunk, a stale cast
+        with open(path, 'w') as f:
+            f.write('\n'.join([
+                "[Sat Jan 10 12:00:00 2026] You begin casting Charm.",
+                "[Sat Jan 10 12:00:05 2026] You begin casting Allure.",
+                "[Sat Jan 10 12:01:00 2026] a gnoll hits YOU for 12 points of damage.",
+                "[Sat Jan 10 12:02:00 2026] Your charm spell has worn off.",
+                "[Sat Jan 10 12:03:00 2026] You begin casting Beguile Undead.",
+                "[Sat Jan 10 12:04:00 2026] Your charm spell has worn off.",
+                "[Sat Jan 10 12:05:00 2026] Your charm spell has worn off.",
+                "[Sat Jan 10 12:06:00 2026] You begin casting Charm Animals.",
+            ]) + '\n')
+        expected = CharmLogParser().scan_file(path)
+        assert expected['total_charms_found'] == 3
+        for num_chunks in range(1, 9):
+            assert stitched(num_chunks) == expected
+
+        # Identical cast times carried across a boundary can only be settled sequentially
+        with open(path, 'w') as f:
+            f.write("[Sat Jan 10 12:00:00 2026] You begin casting Charm.\n"
+                    "[Sat Jan 10 12:00:00 2026] You begin casting Allure.\n"
+                    "[Sat Jan 10 12:01:00 2026] Your charm spell has worn off.\n")
+        assert stitched(3) is None
+        assert CharmLogParser().scan_file(path, workers=3) == CharmLogParser().scan_file(path)
+
+        # Declining is always safe, but seeds 2 and 5 have no boundary ties, so they must stitch
+        for seed in range(20):
+            with open(path, 'w') as f:
+                f.write(_sample_log(num_charms=60, seed=seed))
+            expected = CharmLogParser().scan_file(path)
+            for num_chunks in (2, 3, 7):
+                if seed in (2, 5):
+                    assert stitched(num_chunks) == expected
+                else:
+                    assert stitched(num_chunks) in (None, expected)
+    finally:
+        os.remove(path)
+
+
 if __name__ == "__main__":
     test_basic_calculation()
-
+    test_exact_engine_matches_monte_carlo()
+    test_exact_engine_is_deterministic()
+    test_numpy_engine_matches_exact()
+    test_resist_table_matches_formula()
+    test_batch_matches_single_calculations()
+    test_grid_matches_single_calculations()
+    test_result_cache_eviction_ttl_and_invalidation()
+    test_seeded_parallel_simulation_matches_single_process()
+    test_adaptive_simulation_stops_at_tolerance()
+    test_histogram_percentiles_match_sorted_list()
+    test_columnar_format_matches_rows()
+    test_recommend_spells_matches_single_calculations()
+    test_solve_minimum_finds_smallest_value()
+    test_session_matches_charm_age_chain()
+    test_sensitivity_matches_single_calculations()
+    test_precomputed_results_match_calculator()
+    test_rulesets_keep_separate_tables_and_caches()
+    test_seeded_requests_are_reproducible()
+    test_geometric_kernel_matches_reference_distribution()
+    test_long_horizon_matches_exact_curve()
+    test_target_mix_is_weighted_exact_curves()
+    test_streaming_log_parse_matches_content_parse()
+    test_log_parser_matches_longest_spell_name()
+    test_log_timestamp_decoder_matches_strptime()
+    test_scan_file_matches_line_parser()
+    test_parallel_log_scan_stitches_to_sequential_result()
@@ -41,7 +41,9 @@ def convert_to_charm_spells_format():
             'resist_diff': spell['resist_diff'],
             'max_level': spell['max_level'],
             'classes': [spell['class']],
-            'spell_level': spell['level']
+            'spell_level': spell['level'],
+            'mana': spell['mana'],
+            'duration_ticks': spell['duration_ticks']
         }
 
         if spell.get('animal_only'):
@@ -67,7 +69,7 @@ def generate_charm_spells_data():
         f.write('"""\n\n')
 
         f.write('# Charm spell database\n')
-        f.write('# Format: spell_id: {name, resist_diff, max_level, classes, spell_level, ...}\n')
+        f.write('# Format: spell_id: {name, resist_diff, max_level, classes, spell_level, mana, duration_ticks, ...}\n')
         f.write('CHARM_SPELLS = {\n')
 
         # Sort by class, then level
@@ -82,7 +84,9 @@ def generate_charm_spells_data():
             f.write(f"        'resist_diff': {data['resist_diff']},\n")
             f.write(f"        'max_level': {data['max_level']},\n")
             f.write(f"        'classes': {data['classes']},\n")
-            f.write(f"        'spell_level': {data['spell_level']}")
+            f.write(f"        'spell_level': {data['spell_level']},\n")
+            f.write(f"        'mana': {data['mana']},\n")
+            f.write(f"        'duration_ticks': {data['duration_ticks']}")
 
             if data.get('animal_only'):
                 f.write(',\n        \'animal_only\': True')